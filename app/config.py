@@ -9,6 +9,20 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 10
     MAX_PAGE_SIZE: int = 50
     HUGGINGFACE_API_KEY: str | None = None
+    STORAGE_BACKEND: str = "json"  # json | sqlite
+    SQLITE_PATH: str = "data/udc.sqlite3"
+    SQLITE_BATCH_SIZE: int = 1000
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024  # 0 disables the response cache
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    DATA_EXECUTOR_WORKERS: int = 4  # threads for blocking loads and validation in async routes
+    ADMISSION_SOURCE_CONCURRENCY: int = 8  # concurrent fetches per source; 0 disables admission control
+    ADMISSION_SOURCE_LIMITS: dict[str, int] = {}  # per-source overrides, e.g. {"analytics": 2}
+    ADMISSION_MAX_QUEUE: int = 64  # fetches running or waiting before new ones are shed
+    ADMISSION_VOICE_RESERVED: int = 2  # slots per source (and of the queue) held back for voice
+    ADMISSION_WAIT_SECONDS: float = 1.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    UPLOAD_JOB_THRESHOLD_BYTES: int = 8 * 1024 * 1024  # larger uploads run as background jobs
+    INGEST_JOB_WORKERS: int = 2
 
 
 settings = Settings()
@@ -1,26 +1,29 @@
 import json
 import logging
-from pathlib import Path
 from typing import Any, List
 
 from app.models.analytics import AnalyticsPoint
 
-from .base import BaseConnector
+from .base import FileConnector
 
 logger = logging.getLogger(__name__)
 
 
-class AnalyticsConnector(BaseConnector):
+class AnalyticsConnector(FileConnector):
     """
     Connector for analytics / metrics data backed by a JSON file.
     """
 
+    model = AnalyticsPoint
+    file_name = "analytics.json"
+    index_fields = ("metric",)
+    key_fields = ("metric", "date")
+
     def fetch(self, **kwargs: Any) -> List[AnalyticsPoint]:
-        path = Path("data") / "analytics.json"
+        path = self.path
         logger.info(f"Fetching analytics data from {path}")
         try:
-            raw = json.loads(path.read_text())
-            points = [AnalyticsPoint.model_validate(item) for item in raw]
+            points = list(self.load_snapshot(path).records)
             logger.info(f"Successfully fetched {len(points)} analytics points")
             return points
         except FileNotFoundError:
@@ -1,6 +1,278 @@
-
+import gc
+import json
+import logging
+import os
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, List
+from collections.abc import Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.services.business_rules import (
+    apply_cursor,
+    apply_filters,
+    apply_pagination,
+    apply_projection,
+    encode_cursor,
+    prioritize_recent,
+    seek_after,
+)
+from app.services.data_identifier import identify_data_type
+from app.services.executor import run_blocking
+from app.utils.files import atomic_write
+
+from .indexes import SnapshotIndex
+from .snapshot_file import column_kinds, read_snapshot_file, schema_fingerprint, snapshot_file_path
+
+logger = logging.getLogger(__name__)
+
+# File identity used to detect rewrites: (mtime_ns, size, inode)
+FileKey = Tuple[int, int, int]
+
+
+class Snapshot(NamedTuple):
+    """
+    Validated records parsed from one version of a data file. Snapshots
+    are immutable once published; a new version replaces the registry
+    entry by reference, so readers holding the old one keep a consistent
+    view without locking.
+    """
+
+    key: FileKey
+    records: List[Any]
+    index: SnapshotIndex
+    version: int = 0  # persisted dataset version (see dataset_version); increases when the file is rewritten
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    """
+    Declarative description of what a caller wants from a source.
+    Frozen and built from tuples so it can be used as a cache key.
+    """
+
+    filters: Tuple[Tuple[str, Any], ...] = ()
+    order_by: Optional[str] = "recent"  # "recent" (newest first) or None (storage order)
+    offset: int = 0
+    limit: Optional[int] = None  # None returns every matching record
+    fields: Optional[Tuple[str, ...]] = None  # None returns full records
+    after: Optional[Tuple[Any, Any]] = None  # keyset position (recency, id); replaces offset
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        metric: Optional[str] = None,
+        customer_id: Optional[int] = None,
+        order_by: Optional[str] = "recent",
+        offset: int = 0,
+        limit: Optional[int] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        after: Optional[Tuple[Any, Any]] = None,
+    ) -> "QuerySpec":
+        """Normalize keyword filters into a spec, dropping empty values."""
+        candidates = (
+            ("customer_id", customer_id),
+            ("metric", metric),
+            ("priority", priority),
+            ("status", status),
+        )
+        filters = tuple((name, value) for name, value in candidates if value is not None and value != "")
+        return cls(
+            filters=filters,
+            order_by=order_by,
+            offset=max(0, offset),
+            limit=limit,
+            fields=tuple(fields) if fields else None,
+            after=after,
+        )
+
+    def filter_kwargs(self) -> Dict[str, Any]:
+        """Filters as keyword arguments for apply_filters."""
+        return dict(self.filters)
+
+
+class QueryResult(NamedTuple):
+    """
+    Records answering a QuerySpec plus the match count before pagination.
+    """
+
+    records: List[Any]
+    total: int
+    data_type: str
+    next_cursor: Optional[str] = None  # set when more records follow this page
+    snapshot_version: Optional[int] = None  # dataset version answered from, when known
+
+
+_snapshots: Dict[str, Snapshot] = {}
+_snapshot_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def file_key(path: Path) -> FileKey:
+    """Return the identity of a data file; raises FileNotFoundError if missing."""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _trust_marker(path: Path) -> Path:
+    return Path(path).with_name(f".{Path(path).name}.trusted")
+
+
+def mark_trusted(path: Path, model: Type[BaseModel]) -> None:
+    """
+    Record that a data file, as it is right now, was written from validated
+    model records, so loads may skip validation. Any later rewrite changes
+    the file identity, and any change to the model's fields changes its
+    fingerprint; either voids the mark.
+    """
+    marker = {"key": file_key(path), "schema": schema_fingerprint(model)}
+    _trust_marker(path).write_text(json.dumps(marker))
+
+
+def _is_trusted(path: Path, key: FileKey, model: Type[BaseModel]) -> bool:
+    try:
+        marker = json.loads(_trust_marker(path).read_text())
+        return tuple(marker["key"]) == key and marker["schema"] == schema_fingerprint(model)
+    except (OSError, ValueError, TypeError, KeyError):
+        return False
+
+
+def _version_file(path: Path) -> Path:
+    return Path(path).with_name(f".{Path(path).name}.version")
+
+
+def dataset_version(path: Path, key: FileKey) -> int:
+    """
+    Persistent version of a data file whose identity is key. The number is
+    stored next to the file with the identity it was issued for, and goes
+    up by one whenever the file has been rewritten since (by ingest or by
+    hand). Reloads, restarts and other worker processes see the same
+    number for the same file; concurrent callers noticing one rewrite
+    compute the same next number.
+    """
+    version_file = _version_file(path)
+    try:
+        stored = json.loads(version_file.read_text())
+        version, stored_key = int(stored["version"]), tuple(stored["key"])
+    except (OSError, ValueError, TypeError, KeyError):
+        version, stored_key = 0, None
+    if stored_key == tuple(key):
+        return version
+    version += 1
+    try:
+        with atomic_write(version_file) as out:
+            out.write(json.dumps({"version": version, "key": list(key)}).encode())
+    except OSError as e:
+        # Still a valid version for this process; it is recomputed on the next load
+        logger.warning(f"Could not record dataset version for {path}: {e}")
+    return version
+
+
+_FIELD_PARSERS: Dict[str, Callable[[str], Any]] = {"datetime": datetime.fromisoformat, "date": date.fromisoformat}
+
+
+@lru_cache(maxsize=None)
+def typed_constructor(model: Type[BaseModel]) -> Optional[Callable[[Dict[str, Any]], BaseModel]]:
+    """
+    Build model instances from dicts of already-typed field values without
+    validation, for records this service wrote itself. None when the model
+    has field types snapshot files cannot hold.
+    """
+    if model.__private_attributes__ or model.model_config.get("extra") == "allow":
+        return None
+    if column_kinds(model) is None:
+        return None
+    fields_set = frozenset(model.model_fields)
+    new = model.__new__
+    set_attr = object.__setattr__
+
+    def construct(row: Dict[str, Any]) -> BaseModel:
+        record = new(model)
+        # The attributes model_construct sets, minus its per-field default handling
+        set_attr(record, "__dict__", row)
+        set_attr(record, "__pydantic_fields_set__", fields_set)
+        set_attr(record, "__pydantic_extra__", None)
+        set_attr(record, "__pydantic_private__", None)
+        return record
+
+    return construct
+
+
+@lru_cache(maxsize=None)
+def trusted_constructor(model: Type[BaseModel]) -> Optional[Callable[[Dict[str, Any]], BaseModel]]:
+    """typed_constructor for rows decoded from trusted JSON: only date and datetime strings are parsed."""
+    construct = typed_constructor(model)
+    if construct is None:
+        return None
+    parsers = [(name, _FIELD_PARSERS[kind]) for name, kind in column_kinds(model) if kind in _FIELD_PARSERS]
+
+    def parse_and_construct(row: Dict[str, Any]) -> BaseModel:
+        for name, parse in parsers:
+            row[name] = parse(row[name])
+        return construct(row)
+
+    return parse_and_construct
+
+
+def invalidate_snapshot(path: Path | None = None) -> None:
+    """
+    Drop the cached snapshot for a data file (or every snapshot when path is None).
+    Called after uploads rewrite a file so the next fetch re-parses it.
+    """
+    with _registry_lock:
+        if path is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(os.path.abspath(path), None)
+
+
+def publish_snapshot(path: Path, records: List[Any], index: SnapshotIndex) -> Snapshot:
+    """
+    Install records already in memory as the snapshot for a just-written
+    file, so the next read skips re-parsing and re-validating it.
+    """
+    key = file_key(path)
+    return _publish(os.path.abspath(path), key, records, index, dataset_version(path, key))
+
+
+def _publish(cache_key: str, key: FileKey, records: List[Any], index: SnapshotIndex, version: int) -> Snapshot:
+    with _registry_lock:
+        snapshot = _snapshots[cache_key] = Snapshot(key, records, index, version)
+    return snapshot
+
+
+def _lock_for(cache_key: str) -> threading.Lock:
+    with _registry_lock:
+        lock = _snapshot_locks.get(cache_key)
+        if lock is None:
+            lock = _snapshot_locks[cache_key] = threading.Lock()
+        return lock
+
+
+def build_result(
+    spec: QuerySpec,
+    records: List[Any],
+    total: int,
+    data_type: str,
+    has_more: bool,
+    snapshot_version: Optional[int] = None,
+) -> QueryResult:
+    """Attach the next-page cursor, then apply the spec's projection."""
+    next_cursor = None
+    if has_more and records and spec.order_by == "recent":
+        next_cursor = encode_cursor(records[-1])
+    if spec.fields:
+        records = apply_projection(records, spec.fields)
+    return QueryResult(records, total, data_type, next_cursor, snapshot_version)
 
 
 class BaseConnector(ABC):
@@ -8,6 +280,13 @@ class BaseConnector(ABC):
     Base interface for all data source connectors.
     """
 
+    # Pydantic model each raw record is validated into
+    model: Type[BaseModel]
+    # Fields that get posting-list indexes when a snapshot loads
+    index_fields: Tuple[str, ...] = ()
+    # Fields identifying a record, used to merge upsert/append uploads
+    key_fields: Tuple[str, ...] = ()
+
     @abstractmethod
     def fetch(self, **kwargs: Any) -> List[Any]:
         """
@@ -15,3 +294,228 @@ class BaseConnector(ABC):
         """
         raise NotImplementedError
 
+    def version(self) -> Optional[Hashable]:
+        """
+        Token that changes whenever the underlying data changes, used to key
+        response caches. None means the connector cannot tell, so responses
+        are not cached.
+        """
+        return None
+
+    def pinned(self) -> "BaseConnector":
+        """
+        Connector bound to the data as it is right now, for answering a
+        group of queries from one consistent snapshot. Connectors without
+        snapshots return themselves.
+        """
+        return self
+
+    def query(self, spec: QuerySpec) -> QueryResult:
+        """
+        Answer a query spec. This default is the fallback path: fetch every
+        record and filter, sort and paginate in Python. Connectors that can
+        use an index, a pre-sorted store or SQL override it.
+        """
+        raw = self.fetch()
+        data_type = identify_data_type(raw)
+        records = apply_filters(raw, **spec.filter_kwargs())
+        total = len(records)
+        if spec.after is not None and spec.order_by == "recent":
+            records, has_more = apply_cursor(records, spec.after, spec.limit)
+        else:
+            if spec.order_by == "recent":
+                # Only the page window is needed, so select it instead of sorting all
+                window = None if spec.limit is None else spec.offset + spec.limit
+                records = prioritize_recent(records, top_k=window)
+            if spec.limit is not None:
+                records = apply_pagination(records, offset=spec.offset, limit=spec.limit)
+            elif spec.offset:
+                records = records[spec.offset:]
+            has_more = spec.offset + len(records) < total
+        return build_result(spec, records, total, data_type, has_more)
+
+    async def afetch(self, **kwargs: Any) -> List[Any]:
+        """fetch() on the bounded data executor, for async callers."""
+        return await run_blocking(self.fetch, **kwargs)
+
+    async def aquery(self, spec: QuerySpec) -> QueryResult:
+        """query() on the bounded data executor, for async callers."""
+        return await run_blocking(self.query, spec)
+
+    def stream(self, spec: QuerySpec) -> Iterator[Any]:
+        """
+        Yield every record matching the spec in order, ignoring its limit.
+        This default materializes the result through query(); connectors
+        backed by a snapshot or a database cursor stream instead.
+        """
+        yield from self.query(replace(spec, limit=None)).records
+
+    def load_snapshot(self, path: Path) -> Snapshot:
+        """
+        Return validated records for a JSON file, re-parsing only when the
+        file identity (mtime, size, inode) has changed since the last load.
+        Files written by ingest load from their binary snapshot file when it
+        matches, or are at least rebuilt from JSON without re-validation.
+        """
+        cache_key = os.path.abspath(path)
+        key = file_key(path)
+        snapshot = _snapshots.get(cache_key)
+        if snapshot is not None and snapshot.key == key:
+            return snapshot
+
+        # One loader per file; concurrent callers wait and reuse its result
+        with _lock_for(cache_key):
+            key = file_key(path)
+            snapshot = _snapshots.get(cache_key)
+            if snapshot is not None and snapshot.key == key:
+                return snapshot
+            # Records are long-lived; collecting while hundreds of thousands are
+            # allocated only re-walks them, so the cyclic GC waits until the end
+            with _gc_paused():
+                key, records, index = self._read_file(path, key)
+            return _publish(cache_key, key, records, index, dataset_version(path, key))
+
+    def _read_file(self, path: Path, key: FileKey) -> Tuple[FileKey, List[Any], SnapshotIndex]:
+        construct = typed_constructor(self.model)
+        if construct is not None:
+            data = read_snapshot_file(snapshot_file_path(path), self.model, key, construct)
+            if data is not None:
+                logger.debug(f"Snapshot cache miss for {path}, loaded binary snapshot")
+                # Same fields recency_key reads, as ints that sort the same way
+                recency = data.sort_keys.get("created_at", data.sort_keys.get("date"))
+                return key, data.records, SnapshotIndex(data.records, self.index_fields, data.columns, recency)
+
+        logger.debug(f"Snapshot cache miss for {path}, parsing file")
+        # Identity from the open file, so it matches exactly the bytes read
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            key = (st.st_mtime_ns, st.st_size, st.st_ino)
+            raw = json.loads(f.read())
+        construct = trusted_constructor(self.model) if _is_trusted(path, key, self.model) else None
+        if construct is not None:
+            records = [construct(item) for item in raw]
+        else:
+            records = [self.model.model_validate(item) for item in raw]
+        return key, records, SnapshotIndex(records, self.index_fields)
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Overlapping loads in other threads may re-enable it early; that only costs speed
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+class FileConnector(BaseConnector):
+    """
+    Connector backed by a JSON file in the data directory. Queries are
+    answered from the cached snapshot and its secondary indexes instead
+    of re-filtering and re-sorting every record.
+    """
+
+    file_name: str
+
+    @property
+    def path(self) -> Path:
+        return Path("data") / self.file_name
+
+    def version(self) -> Optional[Hashable]:
+        try:
+            return (os.path.abspath(self.path), file_key(self.path))
+        except OSError:
+            return None
+
+    def query(self, spec: QuerySpec) -> QueryResult:
+        try:
+            snapshot = self.load_snapshot(self.path)
+        except Exception as e:
+            logger.error(f"Failed to load snapshot from {self.path}: {e}")
+            raise
+        return query_snapshot(snapshot, spec)
+
+    def stream(self, spec: QuerySpec) -> Iterator[Any]:
+        return stream_snapshot(self.load_snapshot(self.path), spec)
+
+    def pinned(self) -> BaseConnector:
+        try:
+            snapshot = self.load_snapshot(self.path)
+        except Exception as e:
+            # Nothing to pin; queries will surface the error themselves
+            logger.warning(f"Could not pin snapshot for {self.path}: {e}")
+            return self
+        return PinnedConnector(self, snapshot)
+
+
+class PinnedConnector(BaseConnector):
+    """
+    Read-only view of one snapshot of a file connector. Every query sees
+    the same records even if the file is rewritten meanwhile.
+    """
+
+    def __init__(self, origin: FileConnector, snapshot: Snapshot):
+        self.model = origin.model
+        self.index_fields = origin.index_fields
+        self.key_fields = origin.key_fields
+        self.snapshot = snapshot
+        self._version = (os.path.abspath(origin.path), snapshot.key)
+
+    def fetch(self, **kwargs: Any) -> List[Any]:
+        return list(self.snapshot.records)
+
+    def version(self) -> Optional[Hashable]:
+        return self._version
+
+    def query(self, spec: QuerySpec) -> QueryResult:
+        return query_snapshot(self.snapshot, spec)
+
+    def stream(self, spec: QuerySpec) -> Iterator[Any]:
+        return stream_snapshot(self.snapshot, spec)
+
+
+def query_snapshot(snapshot: Snapshot, spec: QuerySpec) -> QueryResult:
+    """Answer a spec from a snapshot's indexes and recency order."""
+    if spec.order_by == "recent":
+        positions = snapshot.index.ordered(spec.filters)
+    else:
+        positions = snapshot.index.match(spec.filters)
+    total = len(positions)
+    start = spec.offset
+    if spec.after is not None and spec.order_by == "recent":
+        start = seek_after(_RowView(positions, snapshot.records), spec.after)
+    end = None if spec.limit is None else start + spec.limit
+    records = [snapshot.records[p] for p in positions[start:end]]
+    has_more = start + len(records) < total
+    return build_result(spec, records, total, identify_data_type(snapshot.records), has_more, snapshot.version)
+
+
+def stream_snapshot(snapshot: Snapshot, spec: QuerySpec) -> Iterator[Any]:
+    """Lazily yield a snapshot's matching records; only positions are materialized."""
+    if spec.order_by == "recent":
+        positions = snapshot.index.ordered(spec.filters)
+    else:
+        positions = snapshot.index.match(spec.filters)
+    start = spec.offset
+    if spec.after is not None and spec.order_by == "recent":
+        start = seek_after(_RowView(positions, snapshot.records), spec.after)
+    for i in range(start, len(positions)):
+        record = snapshot.records[positions[i]]
+        yield apply_projection([record], spec.fields)[0] if spec.fields else record
+
+
+class _RowView(Sequence):
+    """Records addressed through a list of row positions, without copying."""
+
+    def __init__(self, positions: List[int], records: List[Any]):
+        self.positions = positions
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, i: int) -> Any:
+        return self.records[self.positions[i]]
@@ -1,26 +1,29 @@
 import json
 import logging
-from pathlib import Path
 from typing import Any, List
 
 from app.models.crm import CRMCustomer
 
-from .base import BaseConnector
+from .base import FileConnector
 
 logger = logging.getLogger(__name__)
 
 
-class CRMConnector(BaseConnector):
+class CRMConnector(FileConnector):
     """
     Connector for CRM customer data backed by a JSON file.
     """
 
+    model = CRMCustomer
+    file_name = "customers.json"
+    index_fields = ("status", "customer_id")
+    key_fields = ("customer_id",)
+
     def fetch(self, **kwargs: Any) -> List[CRMCustomer]:
-        path = Path("data") / "customers.json"
+        path = self.path
         logger.info(f"Fetching CRM data from {path}")
         try:
-            raw = json.loads(path.read_text())
-            customers = [CRMCustomer.model_validate(item) for item in raw]
+            customers = list(self.load_snapshot(path).records)
             logger.info(f"Successfully fetched {len(customers)} CRM customers")
             return customers
         except FileNotFoundError:
@@ -0,0 +1,185 @@
+"""
+In-memory secondary indexes over a loaded snapshot.
+"""
+
+import threading
+from bisect import insort
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from app.services.business_rules import recency_key
+
+Filters = Tuple[Tuple[str, Any], ...]
+
+# Filter combinations memoized per index; one-off lookups (a customer_id each) age out
+MEMO_ENTRIES = 256
+
+
+class _Memo:
+    """Least-recently-used map from filter combinations to computed position lists."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Filters, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Filters) -> Optional[List[int]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Filters, value: List[int]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SnapshotIndex:
+    """
+    Posting lists from each filterable value to the sorted row positions
+    holding it, plus the snapshot's newest-first row order.
+
+    Intersections and their recency-ordered forms are memoized per filter
+    combination (the MEMO_ENTRIES most recently used), so repeated queries
+    cost a dict lookup and a slice and filtered counts are O(1).
+    """
+
+    def __init__(
+        self,
+        records: Sequence[Any],
+        fields: Sequence[str],
+        columns: Optional[Mapping[str, Sequence[Any]]] = None,
+        recency: Optional[Sequence[Any]] = None,
+    ):
+        """
+        columns (field values by position) and recency (recency_key values
+        by position) are optional shortcuts for callers that already hold
+        the snapshot column by column, such as snapshot file loads.
+        """
+        self.size = len(records)
+        self.postings: Dict[str, Dict[Any, List[int]]] = {field: {} for field in fields}
+        if columns is not None:
+            for field, values in self.postings.items():
+                for position, value in enumerate(columns[field]):
+                    values.setdefault(value, []).append(position)
+        else:
+            for position, record in enumerate(records):
+                for field, values in self.postings.items():
+                    values.setdefault(getattr(record, field), []).append(position)
+
+        # Stable sort, so equal timestamps keep file order like prioritize_recent
+        sort_key = recency.__getitem__ if recency is not None else (lambda p: recency_key(records[p]))
+        self.recency_order: List[int] = sorted(range(self.size), key=sort_key, reverse=True)
+        self.rank: List[int] = [0] * self.size
+        for rank, position in enumerate(self.recency_order):
+            self.rank[position] = rank
+        self._matches = _Memo(MEMO_ENTRIES)
+        self._ordered = _Memo(MEMO_ENTRIES)
+
+    def patched(self, old: Sequence[Any], records: Sequence[Any], changed: Iterable[int]) -> "SnapshotIndex":
+        """
+        Index for records, which equal old except at the changed positions
+        (replaced in place or appended). Only the affected posting lists and
+        recency slots are touched; self is left intact for pinned readers.
+        """
+        changed = sorted(set(changed))
+        if len(changed) * 8 > len(records):
+            # Large merges: a fresh build is as cheap and simpler
+            return SnapshotIndex(records, tuple(self.postings))
+
+        index = SnapshotIndex.__new__(SnapshotIndex)
+        index.size = len(records)
+        index.postings = {field: dict(values) for field, values in self.postings.items()}
+        copied = set()
+        for field, values in index.postings.items():
+            for position in changed:
+                if position < len(old):
+                    stale = getattr(old[position], field)
+                    if (field, stale) not in copied:
+                        values[stale] = list(values[stale])
+                        copied.add((field, stale))
+                    values[stale].remove(position)
+                    if not values[stale]:
+                        del values[stale]
+                        copied.discard((field, stale))
+                fresh = getattr(records[position], field)
+                if (field, fresh) not in copied:
+                    values[fresh] = list(values.get(fresh, ()))
+                    copied.add((field, fresh))
+                insort(values[fresh], position)
+
+        members = set(changed)
+        order = [position for position in self.recency_order if position not in members]
+        for position in changed:
+            key = recency_key(records[position])
+            lo, hi = 0, len(order)
+            while lo < hi:
+                # Newest first; equal timestamps keep file order, as the stable sort does
+                mid = (lo + hi) // 2
+                other = order[mid]
+                other_key = recency_key(records[other])
+                if other_key > key or (other_key == key and other < position):
+                    lo = mid + 1
+                else:
+                    hi = mid
+            order.insert(lo, position)
+        index.recency_order = order
+        index.rank = [0] * index.size
+        for rank, position in enumerate(order):
+            index.rank[position] = rank
+        index._matches = _Memo(MEMO_ENTRIES)
+        index._ordered = _Memo(MEMO_ENTRIES)
+        return index
+
+    def _relevant(self, filters: Filters) -> Filters:
+        # Filters on fields this source lacks are ignored, as in apply_filters
+        return tuple((field, value) for field, value in filters if field in self.postings)
+
+    def match(self, filters: Filters) -> List[int]:
+        """Row positions (ascending) satisfying every relevant filter."""
+        relevant = self._relevant(filters)
+        if not relevant:
+            return list(range(self.size))
+        cached = self._matches.get(relevant)
+        if cached is not None:
+            return cached
+
+        lists = sorted(
+            (self.postings[field].get(value, []) for field, value in relevant), key=len
+        )
+        result = lists[0]
+        for other in lists[1:]:
+            members = set(other)
+            result = [position for position in result if position in members]
+        self._matches.put(relevant, result)
+        return result
+
+    def ordered(self, filters: Filters) -> List[int]:
+        """Matching row positions in newest-first order."""
+        relevant = self._relevant(filters)
+        if not relevant:
+            return self.recency_order
+        cached = self._ordered.get(relevant)
+        if cached is not None:
+            return cached
+
+        matches = self.match(relevant)
+        if len(matches) * 8 < self.size:
+            # Selective filters (e.g. one customer_id): sort the few hits by rank
+            result = sorted(matches, key=self.rank.__getitem__)
+        else:
+            members = set(matches)
+            result = [position for position in self.recency_order if position in members]
+        self._ordered.put(relevant, result)
+        return result
+
+    def count(self, filters: Filters) -> int:
+        """Number of rows satisfying the filters."""
+        return len(self.match(filters))
@@ -0,0 +1,238 @@
+"""
+Binary columnar snapshot files.
+
+Ingest writes one next to each JSON data file (".<name>.snap") so cold
+loads skip JSON parsing and timestamp string parsing. Layout:
+
+    MAGIC | header length (u32 LE) | JSON header | column blobs
+
+The header names the record model and its schema fingerprint, the
+identity of the JSON file the snapshot was written alongside, and each
+column's kind and blob sizes.
+Columns are arrays: ints and floats as 8-byte values, bools as bytes,
+datetimes as epoch microseconds, dates as ordinals, and strings as a
+table of distinct values plus a 4-byte index per row.
+"""
+
+import json
+import logging
+import struct
+import sys
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Literal, NamedTuple, Optional, Tuple, Type, get_args, get_origin
+
+from pydantic import BaseModel
+
+from app.utils.files import atomic_write
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"UDCSNAP\x01"
+_HEADER_LEN = struct.Struct("<I")
+_EPOCH = datetime(1970, 1, 1)
+_UTC_EPOCH = _EPOCH.replace(tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+# array typecodes per column kind (strings use "I" for their table indexes)
+_TYPECODES = {"int": "q", "float": "d", "bool": "b", "datetime": "q", "date": "i", "str": "I"}
+_KINDS: Dict[Any, str] = {int: "int", float: "float", bool: "bool", str: "str", datetime: "datetime", date: "date"}
+
+
+def snapshot_file_path(path: Path) -> Path:
+    """Binary snapshot file kept next to a JSON data file."""
+    return Path(path).with_name(f".{Path(path).name}.snap")
+
+
+def schema_fingerprint(model: Type[BaseModel]) -> str:
+    """Model name plus every field's name and annotation; changes whenever the schema does."""
+    fields = [(name, repr(field_info.annotation)) for name, field_info in model.model_fields.items()]
+    return f"{model.__module__}.{model.__qualname__}:{fields!r}"
+
+
+def column_kinds(model: Type[BaseModel]) -> Optional[List[Tuple[str, str]]]:
+    """(field, kind) for every field, or None if a field type has no column kind."""
+    kinds = []
+    for name, field_info in model.model_fields.items():
+        annotation = field_info.annotation
+        if get_origin(annotation) is Literal:
+            kind = "str" if all(isinstance(arg, str) for arg in get_args(annotation)) else None
+        else:
+            kind = _KINDS.get(annotation)
+        if kind is None:
+            return None
+        kinds.append((name, kind))
+    return kinds
+
+
+class SnapshotWriter:
+    """
+    Accumulates records column by column, then writes them as a snapshot
+    file. Strings are interned into per-column tables as they arrive, so
+    the buffers stay far smaller than the records themselves.
+    """
+
+    def __init__(self, model: Type[BaseModel], kinds: List[Tuple[str, str]]):
+        self.model = model
+        self.kinds = kinds
+        self.count = 0
+        self._columns = [array(_TYPECODES[kind]) for _, kind in kinds]
+        self._tables: Dict[int, Dict[str, int]] = {i: {} for i, (_, kind) in enumerate(kinds) if kind == "str"}
+        self._offsets: Dict[int, Optional[float]] = {}  # datetime column -> UTC offset seconds (None: naive)
+        self.failed = False
+
+    @classmethod
+    def for_model(cls, model: Type[BaseModel]) -> Optional["SnapshotWriter"]:
+        kinds = column_kinds(model)
+        return cls(model, kinds) if kinds is not None else None
+
+    def add(self, record: BaseModel) -> None:
+        if self.failed:
+            return
+        values = record.__dict__
+        for i, (name, kind) in enumerate(self.kinds):
+            value = values[name]
+            if kind == "str":
+                table = self._tables[i]
+                value = table.setdefault(value, len(table))
+            elif kind == "datetime":
+                value = self._encode_datetime(i, value)
+                if value is None:
+                    # Mixed offsets cannot share one column; the JSON file is enough
+                    self.failed = True
+                    return
+            elif kind == "date":
+                value = value.toordinal()
+            try:
+                self._columns[i].append(value)
+            except OverflowError:
+                # e.g. an int beyond 64 bits; valid for pydantic, so keep the JSON file only
+                self.failed = True
+                return
+        self.count += 1
+
+    def _encode_datetime(self, column: int, value: datetime) -> Optional[int]:
+        offset = value.utcoffset()
+        seconds = None if offset is None else offset.total_seconds()
+        if self._offsets.setdefault(column, seconds) != seconds:
+            return None
+        return (value.replace(tzinfo=None) - _EPOCH - (offset or timedelta())) // _MICROSECOND
+
+    def write(self, path: Path, source_key: Tuple[int, int, int]) -> bool:
+        """Write the snapshot file for a JSON file with identity source_key."""
+        if self.failed:
+            return False
+        columns = []
+        blobs: List[bytes] = []
+        for i, (name, kind) in enumerate(self.kinds):
+            column: Dict[str, Any] = {"name": name, "kind": kind}
+            if kind == "str":
+                table = json.dumps(list(self._tables[i]), ensure_ascii=False).encode()
+                column["table_bytes"] = len(table)
+                blobs.append(table)
+            if kind == "datetime":
+                column["utc_offset"] = self._offsets.get(i)
+            data = self._columns[i].tobytes()
+            column["data_bytes"] = len(data)
+            blobs.append(data)
+            columns.append(column)
+        header = json.dumps(
+            {
+                "model": self.model.__name__,
+                "schema": schema_fingerprint(self.model),
+                "source_key": list(source_key),
+                "count": self.count,
+                "byteorder": sys.byteorder,
+                "columns": columns,
+            }
+        ).encode()
+
+        with atomic_write(path) as out:
+            out.write(MAGIC)
+            out.write(_HEADER_LEN.pack(len(header)))
+            out.write(header)
+            for blob in blobs:
+                out.write(blob)
+        return True
+
+
+class SnapshotData(NamedTuple):
+    """Records read from a snapshot file, plus the columns they were built from."""
+
+    records: List[BaseModel]
+    columns: Dict[str, List[Any]]  # field values by position
+    sort_keys: Dict[str, array]  # datetime and date fields as epoch microseconds / ordinals
+
+
+def read_snapshot_file(
+    path: Path,
+    model: Type[BaseModel],
+    source_key: Tuple[int, int, int],
+    construct: Callable[[Dict[str, Any]], BaseModel],
+) -> Optional[SnapshotData]:
+    """
+    Records from a snapshot file, or None when it is missing, unreadable,
+    or was not written for this model (as currently defined) and this
+    version of the JSON file.
+    construct builds a record from a dict of already-typed values.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not data.startswith(MAGIC):
+        return None
+    try:
+        start = len(MAGIC) + _HEADER_LEN.size
+        (header_len,) = _HEADER_LEN.unpack_from(data, len(MAGIC))
+        header = json.loads(data[start:start + header_len])
+        names = [column["name"] for column in header["columns"]]
+        if (
+            header["model"] != model.__name__
+            or header["schema"] != schema_fingerprint(model)
+            or tuple(header["source_key"]) != tuple(source_key)
+            or names != list(model.model_fields)
+        ):
+            return None
+        view = memoryview(data)
+        pos = start + header_len
+        columns = []
+        sort_keys = {}
+        for column in header["columns"]:
+            table = None
+            if column["kind"] == "str":
+                table = json.loads(bytes(view[pos:pos + column["table_bytes"]]))
+                pos += column["table_bytes"]
+            values = array(_TYPECODES[column["kind"]])
+            values.frombytes(view[pos:pos + column["data_bytes"]])
+            pos += column["data_bytes"]
+            if header["byteorder"] != sys.byteorder:
+                values.byteswap()
+            if len(values) != header["count"]:
+                return None
+            if column["kind"] in ("datetime", "date"):
+                sort_keys[column["name"]] = values
+            columns.append(_decode_column(column, values, table))
+    except (ValueError, KeyError, TypeError, IndexError, struct.error) as e:
+        logger.warning(f"Ignoring unreadable snapshot file {path}: {e}")
+        return None
+    # Same as [construct(dict(zip(names, row))) for row in zip(*columns)], without the bytecode loop
+    records = list(map(construct, map(dict, map(zip, repeat(names), zip(*columns)))))
+    return SnapshotData(records, dict(zip(names, columns)), sort_keys)
+
+
+def _decode_column(column: Dict[str, Any], values: array, table: Optional[List[str]]) -> List[Any]:
+    kind = column["kind"]
+    if kind == "str":
+        return [table[i] for i in values]
+    if kind == "datetime":
+        offset = column["utc_offset"]
+        epoch = _EPOCH if offset is None else _UTC_EPOCH.astimezone(timezone(timedelta(seconds=offset)))
+        return [epoch + timedelta(microseconds=v) for v in values]
+    if kind == "date":
+        return [date.fromordinal(v) for v in values]
+    if kind == "bool":
+        return [bool(v) for v in values]
+    return values.tolist()
@@ -0,0 +1,343 @@
+"""
+SQLite-backed connector variant for large datasets.
+Records live in one indexed table per source so filtered, recency-ordered
+pages are answered with an index range scan plus LIMIT/OFFSET.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import UTC, date, datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.models.analytics import AnalyticsPoint
+from app.models.crm import CRMCustomer
+from app.models.support import SupportTicket
+from app.services.business_rules import apply_projection
+from .base import BaseConnector, QueryResult, QuerySpec, build_result
+
+logger = logging.getLogger(__name__)
+
+
+class TableSpec(NamedTuple):
+    table: str
+    model: Type[BaseModel]
+    json_file: str
+    data_type: str
+    recency_field: str
+    filters: Tuple[str, ...]  # columns apply_filters honours for this source
+    id_field: str  # breaks recency ties in pagination cursors
+    key: Tuple[str, ...]  # primary key for upsert/append uploads
+
+
+SQLITE_TABLES: Dict[str, TableSpec] = {
+    "crm": TableSpec(
+        "customers",
+        CRMCustomer,
+        "customers.json",
+        "tabular_crm",
+        "created_at",
+        ("status", "customer_id"),
+        "customer_id",
+        ("customer_id",),
+    ),
+    "support": TableSpec(
+        "support_tickets",
+        SupportTicket,
+        "support_tickets.json",
+        "tabular_support",
+        "created_at",
+        ("status", "priority", "customer_id"),
+        "ticket_id",
+        ("ticket_id",),
+    ),
+    "analytics": TableSpec(
+        "analytics",
+        AnalyticsPoint,
+        "analytics.json",
+        "time_series_analytics",
+        "date",
+        ("metric",),
+        "metric",
+        ("metric", "date"),
+    ),
+}
+
+# rowid keeps upload order among equal timestamps, like a stable sort
+_ORDER_RECENT = " ORDER BY sort_key DESC, rowid"
+_ORDER_STORAGE = " ORDER BY rowid"
+
+
+def sort_key(value: Any) -> int:
+    """
+    Integer recency key stored alongside each row: epoch microseconds for
+    datetimes (naive values treated as UTC), day ordinal for dates.
+    """
+    if isinstance(value, datetime):
+        aware = value if value.tzinfo else value.replace(tzinfo=UTC)
+        delta = aware - datetime(1970, 1, 1, tzinfo=UTC)
+        return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+    if isinstance(value, date):
+        return value.toordinal()
+    return 0
+
+
+def _read_json(path: str | Path) -> List[Any]:
+    raw = json.loads(Path(path).read_text())
+    return raw if isinstance(raw, list) else [raw]
+
+
+class SQLiteConnector(BaseConnector):
+    """
+    Connector for one source stored in an embedded SQLite database.
+    """
+
+    def __init__(self, source: str, db_path: str | Path | None = None, data_dir: str | Path = "data"):
+        self.source = source
+        self.spec = SQLITE_TABLES[source]
+        self.model = self.spec.model
+        self.key_fields = self.spec.key
+        self.db_path = Path(db_path or settings.SQLITE_PATH)
+        self.data_dir = Path(data_dir)
+        self.columns = tuple(self.model.model_fields)
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        if not self._schema_ready:
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            table = self.spec.table
+            column_defs = ", ".join(
+                f"{name} {'INTEGER' if self.model.model_fields[name].annotation is int else 'TEXT'}"
+                for name in self.columns
+            )
+            json_path = self.data_dir / self.spec.json_file
+            # One write transaction: other threads and processes see either no
+            # table or a seeded one, never an empty table mid-import
+            conn.execute("BEGIN IMMEDIATE")
+            with conn:
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+                ).fetchone()
+                # Dataset version per source, bumped in the same transaction as each write
+                conn.execute("CREATE TABLE IF NOT EXISTS udc_versions (source TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({column_defs}, sort_key INTEGER NOT NULL)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_recency ON {table} (sort_key)")
+                for column in self.spec.filters:
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} ({column}, sort_key)"
+                    )
+                if not exists and json_path.exists():
+                    # First use of this database: seed it from the existing JSON file
+                    self._insert(conn, _read_json(json_path), replace=True)
+            # Only now may other threads skip this check and query the table
+            self._schema_ready = True
+
+    def _bump_version(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "INSERT INTO udc_versions (source, version) VALUES (?, 1) "
+            "ON CONFLICT (source) DO UPDATE SET version = version + 1",
+            (self.source,),
+        )
+
+    def _read_version(self, conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT version FROM udc_versions WHERE source = ?", (self.source,)).fetchone()
+        return row[0] if row else 0
+
+    def _row(self, record: BaseModel) -> Tuple[Any, ...]:
+        dumped = record.model_dump(mode="json")
+        return (*(dumped[name] for name in self.columns), sort_key(getattr(record, self.spec.recency_field)))
+
+    def _to_models(self, rows: Iterable[Tuple[Any, ...]]) -> List[BaseModel]:
+        return [self.model.model_validate(dict(zip(self.columns, row))) for row in rows]
+
+    def bulk_load(self, records: Iterable[Any], *, replace: bool = True) -> int:
+        """
+        Validate and insert records in batches inside a single transaction.
+        With replace=True the table is emptied first. Returns rows written.
+        """
+        conn = self._connect()
+        with conn:
+            return self._insert(conn, records, replace=replace)
+
+    def _insert(self, conn: sqlite3.Connection, records: Iterable[Any], *, replace: bool) -> int:
+        """bulk_load within the caller's transaction."""
+        table = self.spec.table
+        placeholders = ", ".join("?" for _ in range(len(self.columns) + 1))
+        insert = f"INSERT INTO {table} ({', '.join(self.columns)}, sort_key) VALUES ({placeholders})"
+        models = (
+            item if isinstance(item, self.model) else self.model.model_validate(item) for item in records
+        )
+        written = 0
+        if replace:
+            # New contents may repeat keys; merge() recreates the key index when needed
+            conn.execute(f"DROP INDEX IF EXISTS ux_{table}_key")
+            conn.execute(f"DELETE FROM {table}")
+        while True:
+            batch = [self._row(record) for record in islice(models, settings.SQLITE_BATCH_SIZE)]
+            if not batch:
+                break
+            conn.executemany(insert, batch)
+            written += len(batch)
+        self._bump_version(conn)
+        logger.info(f"Loaded {written} rows into SQLite table {table}")
+        return written
+
+    def merge(self, records: Iterable[Any], *, update: bool = True) -> Tuple[int, int, int]:
+        """
+        Insert records whose key is new. With update=True (upsert), rows
+        whose key exists are overwritten only if a value differs; otherwise
+        (append) they are left alone. Returns (inserted, updated, unchanged).
+        """
+        conn = self._connect()
+        table = self.spec.table
+        key = ", ".join(self.spec.key)
+        columns = (*self.columns, "sort_key")
+        if update:
+            assignments = ", ".join(f"{name} = excluded.{name}" for name in columns)
+            differs = " OR ".join(f"{table}.{name} IS NOT excluded.{name}" for name in columns)
+            conflict = f"ON CONFLICT ({key}) DO UPDATE SET {assignments} WHERE {differs}"
+        else:
+            conflict = f"ON CONFLICT ({key}) DO NOTHING"
+        statement = (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) {conflict}"
+        )
+        models = (
+            item if isinstance(item, self.model) else self.model.model_validate(item) for item in records
+        )
+        seen = 0
+        with conn:
+            try:
+                conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_key ON {table} ({key})")
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"Stored {self.source} rows repeat keys ({key}); upload with mode=replace first") from e
+            rows_before = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            changes_before = conn.total_changes
+            while True:
+                batch = [self._row(record) for record in islice(models, settings.SQLITE_BATCH_SIZE)]
+                if not batch:
+                    break
+                conn.executemany(statement, batch)
+                seen += len(batch)
+            inserted = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - rows_before
+            changed = conn.total_changes - changes_before
+            if changed:
+                self._bump_version(conn)
+        logger.info(f"Merged {seen} rows into SQLite table {table}: {inserted} new, {changed - inserted} updated")
+        return inserted, changed - inserted, seen - changed
+
+    def import_json(self, path: str | Path) -> int:
+        """Replace the table contents with the records of a JSON file."""
+        return self.bulk_load(_read_json(path))
+
+    def version(self) -> Optional[Hashable]:
+        # Read from the database, so writes by other processes are noticed too
+        return (str(self.db_path.resolve()), self.spec.table, self._read_version(self._connect()))
+
+    def fetch(self, **kwargs: Any) -> List[Any]:
+        table = self.spec.table
+        logger.info(f"Fetching {self.source} data from SQLite table {table}")
+        try:
+            rows = self._connect().execute(
+                f"SELECT {', '.join(self.columns)} FROM {table} ORDER BY rowid"
+            ).fetchall()
+            return self._to_models(rows)
+        except sqlite3.Error as e:
+            logger.error(f"SQLite error fetching {self.source} data: {e}", exc_info=True)
+            raise
+
+    def _where(self, spec: QuerySpec) -> Tuple[str, List[Any], str, List[Any]]:
+        """WHERE clause for the spec's filters, plus the keyset seek condition."""
+        table = self.spec.table
+        clauses = []
+        params: List[Any] = []
+        for name, value in spec.filters:
+            if name in self.spec.filters:
+                clauses.append(f"{name} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        seek = ""
+        seek_params: List[Any] = []
+        if spec.after is not None and spec.order_by == "recent":
+            # Resume after the cursor row; if it is gone, skip its whole tie run.
+            # The leading sort_key <= ? is the bound SQLite can seek the index on.
+            after_key = sort_key(spec.after[0])
+            seek = (
+                f"{' AND' if clauses else ' WHERE'} sort_key <= ? AND (sort_key < ? OR (sort_key = ? AND rowid > "
+                f"COALESCE((SELECT MIN(rowid) FROM {table} WHERE sort_key = ? AND {self.spec.id_field} = ?), "
+                f"(SELECT MAX(rowid) FROM {table}))))"
+            )
+            seek_params = [after_key, after_key, after_key, after_key, spec.after[1]]
+        return where, params, seek, seek_params
+
+    def query(self, spec: QuerySpec) -> QueryResult:
+        """Answer the spec with an indexed scan; filters this source lacks are ignored."""
+        table = self.spec.table
+        where, params, seek, seek_params = self._where(spec)
+        order = _ORDER_RECENT if spec.order_by == "recent" else _ORDER_STORAGE
+        page = " LIMIT ? OFFSET ?"
+        # One extra row tells us whether another page follows
+        page_params = [-1 if spec.limit is None else spec.limit + 1, 0 if seek else spec.offset]
+
+        try:
+            conn = self._connect()
+            # One read transaction: version, count and page all see the same WAL snapshot
+            conn.execute("BEGIN")
+            try:
+                version = self._read_version(conn)
+                total = conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+                rows = conn.execute(
+                    f"SELECT {', '.join(self.columns)} FROM {table}{where}{seek}{order}{page}",
+                    [*params, *seek_params, *page_params],
+                ).fetchall()
+                has_rows = total > 0 or conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is not None
+            finally:
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"SQLite error querying {self.source} data: {e}", exc_info=True)
+            raise
+
+        has_more = spec.limit is not None and len(rows) > spec.limit
+        records: List[Any] = self._to_models(rows[: spec.limit])
+        data_type = self.spec.data_type if has_rows else "empty"
+        return build_result(spec, records, total, data_type, has_more, version)
+
+    def stream(self, spec: QuerySpec) -> Iterator[Any]:
+        """Yield matching rows from an open cursor, one batch in memory at a time."""
+        where, params, seek, seek_params = self._where(spec)
+        order = _ORDER_RECENT if spec.order_by == "recent" else _ORDER_STORAGE
+        sql = f"SELECT {', '.join(self.columns)} FROM {self.spec.table}{where}{seek}{order}"
+        if not seek and spec.offset:
+            sql += f" LIMIT -1 OFFSET {int(spec.offset)}"
+        # A dedicated connection, so the open cursor never shares a thread's query state
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            self._ensure_schema(conn)
+            cursor = conn.execute(sql, [*params, *seek_params])
+            while True:
+                rows = cursor.fetchmany(settings.SQLITE_BATCH_SIZE)
+                if not rows:
+                    break
+                for record in self._to_models(rows):
+                    yield apply_projection([record], spec.fields)[0] if spec.fields else record
+        finally:
+            conn.close()
@@ -1,26 +1,29 @@
 import json
 import logging
-from pathlib import Path
 from typing import Any, List
 
 from app.models.support import SupportTicket
 
-from .base import BaseConnector
+from .base import FileConnector
 
 logger = logging.getLogger(__name__)
 
 
-class SupportConnector(BaseConnector):
+class SupportConnector(FileConnector):
     """
     Connector for support ticket data backed by a JSON file.
     """
 
+    model = SupportTicket
+    file_name = "support_tickets.json"
+    index_fields = ("status", "priority", "customer_id")
+    key_fields = ("ticket_id",)
+
     def fetch(self, **kwargs: Any) -> List[SupportTicket]:
-        path = Path("data") / "support_tickets.json"
+        path = self.path
         logger.info(f"Fetching support tickets from {path}")
         try:
-            raw = json.loads(path.read_text())
-            tickets = [SupportTicket.model_validate(item) for item in raw]
+            tickets = list(self.load_snapshot(path).records)
             logger.info(f"Successfully fetched {len(tickets)} support tickets")
             return tickets
         except FileNotFoundError:
@@ -1,11 +1,12 @@
 from pathlib import Path
 
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.config import settings
 from app.routers import analyze, data, health, llm, upload
+from app.services.admission import OverloadedError
 from app.utils.logging import configure_logging
 
 
@@ -16,6 +17,17 @@ app = FastAPI(
     description="Unified interface for LLMs to query CRM, support tickets, and analytics via function calling.",
 )
 
+
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    """Shed requests fail fast with a retry hint instead of queueing."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 app.include_router(health.router)
 app.include_router(data.router)
 app.include_router(upload.router)
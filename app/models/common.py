@@ -1,5 +1,5 @@
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from typing import Any, List, Optional
 
 
@@ -11,9 +11,15 @@ class Metadata(BaseModel):
     source: Optional[str] = None
     context_message: Optional[str] = None
     voice_summary: Optional[str] = None  # Short phrase for TTS when voice=true
+    next_cursor: Optional[str] = None  # Pass as cursor to fetch the following page
+    snapshot_version: Optional[int] = None  # Dataset version the response was read from
 
 
 class DataResponse(BaseModel):
     data: List[Any]
     metadata: Metadata
 
+    # JSON bytes memoized by app.services.serialization
+    _rendered: Optional[bytes] = PrivateAttr(default=None)
+    _rendered_columnar: Optional[bytes] = PrivateAttr(default=None)
+
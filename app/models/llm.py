@@ -1,9 +1,11 @@
 """Request/response models for LLM integration."""
 
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 from pydantic import BaseModel, Field
 
+from app.models.common import DataResponse
+
 
 class LLMToolCallRequest(BaseModel):
     """Request body for executing an LLM tool call."""
@@ -16,3 +18,28 @@ class LLMToolCallRequest(BaseModel):
         default_factory=dict,
         description="Arguments from the LLM's tool call (e.g. status, priority, voice)",
     )
+
+
+class LLMBatchRequest(BaseModel):
+    """Request body for executing several tool calls from one LLM turn."""
+
+    calls: List[LLMToolCallRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=20,
+        description="Tool calls to execute concurrently against one data snapshot",
+    )
+
+
+class LLMBatchResult(BaseModel):
+    """Outcome of one call in a batch: either a result or an error."""
+
+    tool: str
+    result: Optional[DataResponse] = None
+    error: Optional[str] = None
+
+
+class LLMBatchResponse(BaseModel):
+    """Batch results, in the same order as the submitted calls."""
+
+    results: List[LLMBatchResult]
@@ -5,6 +5,8 @@ from typing import Literal
 
 from pydantic import BaseModel
 
+from app.models.crm import CRMCustomer
+
 
 TicketPriority = Literal["low", "medium", "high"]
 TicketStatus = Literal["open", "closed"]
@@ -18,3 +20,8 @@ class SupportTicket(BaseModel):
     created_at: datetime
     status: TicketStatus
 
+
+class SupportTicketWithCustomer(SupportTicket):
+    """Support ticket joined to the CRM customer who raised it."""
+
+    customer: CRMCustomer
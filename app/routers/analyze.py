@@ -6,7 +6,8 @@ import logging
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
-from app.services.data_service import fetch_data
+from app.services.admission import OverloadedError
+from app.services.data_service import afetch_data
 from app.services.huggingface_service import analyze_data
 
 logger = logging.getLogger(__name__)
@@ -30,9 +31,12 @@ async def analyze(request: AnalyzeRequest):
     all_data = {}
     for src in sources:
         try:
-            result = fetch_data(src, limit=50, voice=False)
+            # Off the event loop, and coalesced with identical in-flight fetches
+            result = await afetch_data(src, limit=50, voice=False)
             if result.data:
                 all_data[src] = result.data
+        except OverloadedError:
+            raise
         except Exception as e:
             logger.warning("Could not fetch %s: %s", src, e)
 
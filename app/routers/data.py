@@ -1,16 +1,66 @@
 import logging
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
 from app.config import settings
 from app.models.common import DataResponse
-from app.services.data_service import fetch_data
+from app.services.business_rules import InvalidCursorError, InvalidFieldsError
+from app.services.data_service import CONNECTOR_MAP, data_etag, fetch_data, fetch_joined, stream_data
+from app.services.serialization import RESPONSE_FORMATS, DataJSONResponse, iter_ndjson
+from app.utils.etag import etag_matches
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+@router.get("/data/join/tickets", response_model=DataResponse)
+def get_joined_tickets(
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    status: str | None = Query(None, description="Ticket status filter"),
+    priority: str | None = Query(None, description="Ticket priority filter"),
+    customer_status: str | None = Query(None, description="Customer status filter"),
+    customer_id: int | None = Query(None),
+    voice: bool = Query(False, description="Apply voice optimizations (max 10 items)"),
+    cursor: str | None = Query(None, description="metadata.next_cursor of the previous page; replaces offset"),
+):
+    """Support tickets joined to their CRM customer on customer_id."""
+    logger.info(f"GET /data/join/tickets - limit={limit}, offset={offset}, voice={voice}, cursor={cursor}")
+    try:
+        result = fetch_joined(
+            limit=limit,
+            offset=offset,
+            status=status,
+            priority=priority,
+            customer_status=customer_status,
+            customer_id=customer_id,
+            voice=voice,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Rendered once to JSON bytes instead of re-validated through response_model
+    return DataJSONResponse(result)
+
+
+@router.get("/data/{source}/stream")
+def stream_source(
+    source: str,
+    status: str | None = Query(None),
+    priority: str | None = Query(None),
+    metric: str | None = Query(None),
+    customer_id: int | None = Query(None),
+):
+    """Export every matching record, newest first, as newline-delimited JSON."""
+    logger.info(f"GET /data/{source}/stream - status={status}, priority={priority}, metric={metric}")
+    if source not in CONNECTOR_MAP:
+        raise HTTPException(status_code=404, detail=f"Unknown source: {source}")
+    records = stream_data(source, status=status, priority=priority, metric=metric, customer_id=customer_id)
+    return StreamingResponse(iter_ndjson(records), media_type="application/x-ndjson")
+
+
 @router.get("/data/{source}", response_model=DataResponse)
 def get_data(
     source: str,
@@ -19,15 +69,34 @@ def get_data(
     status: str | None = Query(None),
     priority: str | None = Query(None),
     metric: str | None = Query(None),
+    customer_id: int | None = Query(None, description="Only this customer's record or tickets"),
     voice: bool = Query(False, description="Apply voice optimizations (max 10 items)"),
+    cursor: str | None = Query(None, description="metadata.next_cursor of the previous page; replaces offset"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. name,status"),
+    response_format: str = Query(
+        "json", alias="format", pattern="^(json|columnar)$", description="json, or columnar for {columns, rows}"
+    ),
+    if_none_match: str | None = Header(None),
 ):
-    logger.info(f"GET /data/{source} - limit={limit}, offset={offset}, voice={voice}")
-    return fetch_data(
-        source,
+    logger.info(f"GET /data/{source} - limit={limit}, offset={offset}, voice={voice}, cursor={cursor}, fields={fields}")
+    params = dict(
         limit=limit,
         offset=offset,
         status=status,
         priority=priority,
         metric=metric,
+        customer_id=customer_id,
         voice=voice,
+        cursor=cursor,
+        fields=fields,
     )
+    try:
+        etag = data_etag(source, response_format=response_format, **params)
+        if etag_matches(if_none_match, etag):
+            logger.info(f"GET /data/{source} - not modified")
+            return Response(status_code=304, headers={"ETag": etag})
+        result = fetch_data(source, **params)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Rendered once to JSON bytes instead of re-validated through response_model
+    return RESPONSE_FORMATS[response_format](result, headers={"ETag": etag} if etag else None)
@@ -1,8 +1,22 @@
-
 from fastapi import APIRouter
 
+from app.services.admission import admission
+from app.services.response_cache import response_cache
+
 router = APIRouter()
 
 @router.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@router.get("/health/cache")
+def cache_stats():
+    """Response cache hit/miss counters."""
+    return response_cache.stats()
+
+
+@router.get("/health/admission")
+def admission_stats():
+    """Admitted fetches per source and how many were shed."""
+    return admission.stats()
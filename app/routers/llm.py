@@ -3,10 +3,22 @@ LLM integration endpoints for function/tool calling.
 PRODUCTION READY - OpenAI + Anthropic compatible.
 """
 
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, HTTPException, Query
-from app.models.llm import LLMToolCallRequest
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Tuple
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from app.connectors.base import BaseConnector
+from app.models.common import DataResponse
+from app.models.llm import LLMBatchRequest, LLMBatchResponse, LLMBatchResult, LLMToolCallRequest
 from app.schemas.llm_tools import get_anthropic_tools, get_openai_tools
+from app.services.admission import OverloadedError
+from app.services.business_rules import InvalidCursorError, InvalidFieldsError
+from app.services.executor import run_blocking
+from app.services.serialization import RESPONSE_FORMATS
+from app.utils.etag import compute_etag, etag_matches
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/llm", tags=["LLM Integration"])
@@ -18,9 +30,23 @@ TOOL_TO_SOURCE = {
     "get_analytics": "analytics",
 }
 
+# Tools answered by joining sources instead of reading one
+JOIN_TOOLS = {
+    "get_customer_tickets": "support+crm",
+}
+
+@lru_cache(maxsize=None)
+def _tools_etag(provider: str) -> str:
+    """ETag of a provider's tool schemas; they are static, so hash them once."""
+    tools = get_openai_tools() if provider == "openai" else get_anthropic_tools()
+    return compute_etag(json.dumps(tools, sort_keys=True).encode())
+
+
 @router.get("/tools")
 def get_tools(
+    response: Response,
     provider: str = Query("openai", description="openai or anthropic"),
+    if_none_match: str | None = Header(None),
 ):
     """
     Return tool definitions for LLM function calling.
@@ -29,56 +55,154 @@ def get_tools(
     logger.info(f"GET /llm/tools - provider={provider}")
     provider_lower = provider.lower()
     
+    if provider_lower not in ("openai", "anthropic"):
+        logger.warning(f"Invalid provider requested: {provider}")
+        raise HTTPException(status_code=400, detail="provider must be 'openai' or 'anthropic'")
+
+    etag = _tools_etag(provider_lower)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     if provider_lower == "openai":
         tools = get_openai_tools()
         logger.debug(f"Returning {len(tools)} OpenAI tools")
         return {"tools": tools}
-    elif provider_lower == "anthropic":
+    else:
         tools = get_anthropic_tools()
         logger.debug(f"Returning {len(tools)} Anthropic tools")
         return {"tools": tools}
-    else:
-        logger.warning(f"Invalid provider requested: {provider}")
-        raise HTTPException(status_code=400, detail="provider must be 'openai' or 'anthropic'")
 
-@router.post("/query")
-def execute_tool_call(request: LLMToolCallRequest):
+@router.post("/query", response_model=DataResponse)
+def execute_tool_call(
+    request: LLMToolCallRequest,
+    response_format: str = Query(
+        "json", alias="format", pattern="^(json|columnar)$", description="json, or columnar for {columns, rows}"
+    ),
+):
     """
     Execute a tool call from an LLM and return data.
     Call this when your LLM returns a tool_use block; pass the tool name and arguments here.
+    format=columnar sends field names once, which saves LLM context tokens.
     """
-    from app.services.data_service import fetch_data
+    logger.info(f"POST /llm/query - tool={request.tool}, arguments={request.arguments}, format={response_format}")
+    return RESPONSE_FORMATS[response_format](run_tool_call(request))
 
-    logger.info(f"POST /llm/query - tool={request.tool}, arguments={request.arguments}")
-    
-    source = TOOL_TO_SOURCE.get(request.tool)
+
+@router.post("/query/batch", response_model=LLMBatchResponse)
+async def execute_tool_calls(request: LLMBatchRequest):
+    """
+    Execute several tool calls from one LLM turn concurrently.
+    All calls read the same data snapshot; results come back in request
+    order, with a per-call error instead of failing the whole batch.
+    With STORAGE_BACKEND=sqlite there is no batch-wide snapshot: each call
+    reads in its own transaction, so an upload landing mid-batch may be
+    seen by some calls and not others.
+    """
+    from app.services.data_service import pin_connectors
+
+    logger.info(f"POST /llm/query/batch - {len(request.calls)} calls: {[c.tool for c in request.calls]}")
+    # Pinning may load and validate every source's file; keep that off the event loop
+    connectors = await run_blocking(pin_connectors)
+
+    async def run(call: LLMToolCallRequest) -> LLMBatchResult:
+        try:
+            result = await arun_tool_call(call, connectors)
+            return LLMBatchResult(tool=call.tool, result=result)
+        except HTTPException as e:
+            return LLMBatchResult(tool=call.tool, error=str(e.detail))
+        except OverloadedError as e:
+            return LLMBatchResult(tool=call.tool, error=str(e))
+        except Exception as e:
+            logger.exception(f"Batch tool call failed: {call.tool}")
+            return LLMBatchResult(tool=call.tool, error=str(e))
+
+    results = await asyncio.gather(*(run(call) for call in request.calls))
+    return LLMBatchResponse(results=list(results))
+
+
+def _resolve_tool_call(request: LLMToolCallRequest) -> Tuple[str, Dict[str, Any]]:
+    """Map a tool call to its source and fetch keyword arguments; raises HTTPException for bad calls."""
+    source = TOOL_TO_SOURCE.get(request.tool) or JOIN_TOOLS.get(request.tool)
     if not source:
         logger.warning(f"Unknown tool requested: {request.tool}")
         raise HTTPException(
             status_code=400,
-            detail=f"Unknown tool: {request.tool}. Available: {list(TOOL_TO_SOURCE.keys())}",
+            detail=f"Unknown tool: {request.tool}. Available: {[*TOOL_TO_SOURCE, *JOIN_TOOLS]}",
         )
 
     args = request.arguments or {}
-    result = fetch_data(
-        source,
+    customer_id = args.get("customer_id")
+    try:
+        if customer_id is not None and customer_id != "":
+            customer_id = int(customer_id)
+        else:
+            customer_id = None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"customer_id must be an integer, got {customer_id!r}")
+
+    kwargs: Dict[str, Any] = dict(
         limit=args.get("limit"),
         offset=args.get("offset", 0),
         status=args.get("status"),
         priority=args.get("priority"),
-        metric=args.get("metric"),
+        customer_id=customer_id,
         voice=args.get("voice", False),
+        cursor=args.get("cursor"),
     )
+    if request.tool in JOIN_TOOLS:
+        kwargs["customer_status"] = args.get("customer_status")
+    else:
+        kwargs["metric"] = args.get("metric")
+        kwargs["fields"] = args.get("fields")
+    return source, kwargs
+
+
+def run_tool_call(
+    request: LLMToolCallRequest,
+    connectors: Mapping[str, BaseConnector] | None = None,
+) -> DataResponse:
+    """Resolve a tool call to a data fetch; raises HTTPException for bad calls."""
+    from app.services.data_service import fetch_data, fetch_joined
+
+    source, kwargs = _resolve_tool_call(request)
+    try:
+        if request.tool in JOIN_TOOLS:
+            result = fetch_joined(connectors=connectors, **kwargs)
+        else:
+            result = fetch_data(source, connectors=connectors, **kwargs)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     logger.info(f"Tool call success: {request.tool} → {result.metadata.returned_results} items from {source}")
     return result
 
+
+async def arun_tool_call(
+    request: LLMToolCallRequest,
+    connectors: Mapping[str, BaseConnector] | None = None,
+) -> DataResponse:
+    """run_tool_call for async routes, with blocking work on the data executor."""
+    from app.services.data_service import afetch_data, fetch_joined
+
+    source, kwargs = _resolve_tool_call(request)
+    try:
+        if request.tool in JOIN_TOOLS:
+            result = await run_blocking(fetch_joined, connectors=connectors, **kwargs)
+        else:
+            result = await afetch_data(source, connectors=connectors, **kwargs)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Tool call success: {request.tool} → {result.metadata.returned_results} items from {source}")
+    return result
+
 @router.get("/health")
 def llm_health():
     """Health check for LLM integration"""
     return {
         "status": "healthy",
-        "tools": list(TOOL_TO_SOURCE.keys()),
+        "tools": [*TOOL_TO_SOURCE, *JOIN_TOOLS],
         "providers": ["openai", "anthropic"],
         "data_sources": list(TOOL_TO_SOURCE.values())
     }
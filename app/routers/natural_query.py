@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import Dict, Any
-from app.routers.llm import execute_tool_call
+from app.models.llm import LLMToolCallRequest
+from app.routers.llm import arun_tool_call
 
 router = APIRouter(prefix="/query", tags=["🎤 Voice Query"])
 
@@ -22,12 +23,13 @@ async def voice_to_data(query: VoiceQuery):
     else:
         return {"error": "Try: 'churn rate' or 'support tickets'"}
     
-    request = type('obj', (object,), {'tool': tool, 'arguments': args})()
-    result = execute_tool_call(request)
+    request = LLMToolCallRequest(tool=tool, arguments=args)
+    # Blocking work runs on the data executor; concurrent voice sessions coalesce
+    result = await arun_tool_call(request)
     
     return {
         "voice_query": query.query,
         "tool_used": tool,
-        "results": len(result.get('data', [])),
+        "results": len(result.data),
         "data": result
     }
@@ -1,12 +1,34 @@
 """File upload router for custom data."""
 
-import csv
-import io
-import json
 import logging
+import os
+import shutil
+import tempfile
+import threading
 from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.config import settings
+from app.connectors.base import BaseConnector, invalidate_snapshot, publish_snapshot
+from app.connectors.indexes import SnapshotIndex
+from app.models.analytics import AnalyticsPoint
+from app.models.crm import CRMCustomer
+from app.models.support import SupportTicket
+from app.services.executor import run_blocking
+from app.services.jobs import job_queue
+from app.services.ingest import (
+    IngestStats,
+    iter_rows,
+    merge_records,
+    peek,
+    validate_rows,
+    write_json_records,
+)
+from app.services.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -14,44 +36,166 @@ router = APIRouter(prefix="/upload", tags=["Upload"])
 
 DATA_DIR = Path(__file__).resolve().parents[2] / "data"
 SOURCE_FILES = {"crm": "customers.json", "support": "support_tickets.json", "analytics": "analytics.json"}
+SOURCE_MODELS: dict[str, type[BaseModel]] = {"crm": CRMCustomer, "support": SupportTicket, "analytics": AnalyticsPoint}
+
+# One writer per source, so concurrent merges never start from the same snapshot
+_write_locks = {source: threading.Lock() for source in SOURCE_FILES}
+
+
+def ingest_upload(
+    source: str,
+    stream: BinaryIO,
+    filename: Optional[str],
+    mode: str = "replace",
+    stats: Optional[IngestStats] = None,
+) -> IngestStats:
+    """
+    Parse, validate and store an upload as one streaming pass.
+    replace swaps in the uploaded rows; append adds rows with new keys;
+    upsert also overwrites rows whose values changed. Invalid rows are
+    skipped and counted; storage is left untouched when no row is valid.
+    stats, if given, is updated live as rows stream past.
+    Raises IngestError for undecodable or unparsable files.
+    """
+    from app.services.data_service import CONNECTOR_MAP
+
+    stats = stats if stats is not None else IngestStats()
+    records = peek(validate_rows(iter_rows(stream, filename), SOURCE_MODELS[source], stats))
+    if records is None:
+        return stats
+
+    connector = CONNECTOR_MAP[source]
+    with _write_locks[source]:
+        if settings.STORAGE_BACKEND == "sqlite":
+            if mode == "replace":
+                stats.inserted = connector.bulk_load(records)
+            else:
+                stats.inserted, stats.updated, stats.unchanged = connector.merge(records, update=mode == "upsert")
+        elif mode == "replace":
+            file_path = DATA_DIR / SOURCE_FILES[source]
+            stats.inserted = write_json_records(file_path, records)
+            invalidate_snapshot(file_path)
+        elif not _merge_json(source, connector, records, stats, update=mode == "upsert"):
+            return stats  # nothing changed; snapshot and caches stay valid
+    response_cache.invalidate(source)
+    return stats
+
+
+def _merge_json(
+    source: str,
+    connector: BaseConnector,
+    records: Iterator[BaseModel],
+    stats: IngestStats,
+    *,
+    update: bool,
+) -> bool:
+    """
+    Merge into the JSON file from its in-memory snapshot, then publish the
+    merged records with incrementally patched indexes. Returns False when
+    the upload changed nothing. The indexes are patched before the file is
+    written, so a failure leaves the file, snapshot and caches in step.
+    """
+    file_path = DATA_DIR / SOURCE_FILES[source]
+    try:
+        current = connector.load_snapshot(file_path)
+        existing, index = current.records, current.index
+    except FileNotFoundError:
+        existing, index = [], SnapshotIndex([], connector.index_fields)
+
+    merged, changed = merge_records(existing, records, connector.key_fields, stats, update=update)
+    if not changed:
+        return False
+    patched = index.patched(existing, merged, changed)
+    write_json_records(file_path, merged)
+    publish_snapshot(file_path, merged, patched)
+    return True
+
+
+def upload_summary(source: str, mode: str, stats: IngestStats) -> Dict[str, Any]:
+    """Response body for a finished upload; a 400 when no row was valid."""
+    if not stats.accepted:
+        detail = {"message": "No valid records; existing data left unchanged", "errors": stats.errors}
+        raise HTTPException(status_code=400, detail=detail)
+    logger.info(
+        "Uploaded %d records to %s (mode=%s): %d inserted, %d updated, %d unchanged, %d rejected",
+        stats.accepted, source, mode, stats.inserted, stats.updated, stats.unchanged, stats.rejected,
+    )
+    return {
+        "status": "ok",
+        "source": source,
+        "mode": mode,
+        "records": stats.accepted,
+        "inserted": stats.inserted,
+        "updated": stats.updated,
+        "unchanged": stats.unchanged,
+        "rejected": stats.rejected,
+        "errors": stats.errors,
+    }
 
 
-def parse_csv(content: str) -> list:
-    """Parse CSV content into list of dicts."""
-    reader = csv.DictReader(io.StringIO(content))
-    return list(reader)
+def _spool(stream: BinaryIO) -> str:
+    """Copy an upload to a temp file that outlives the request; returns its path."""
+    fd, path = tempfile.mkstemp(prefix="udc-upload-")
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(stream, out, length=1024 * 1024)
+    return path
+
+
+def _ingest_spooled(source: str, path: str, filename: Optional[str], mode: str, stats: IngestStats) -> Dict[str, Any]:
+    try:
+        with open(path, "rb") as stream:
+            ingest_upload(source, stream, filename, mode, stats)
+        return upload_summary(source, mode, stats)
+    finally:
+        os.unlink(path)
+
+
+def _upload_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
 
 
 @router.post("/{source}")
-async def upload_data(source: str, file: UploadFile = File(...)):
+async def upload_data(
+    source: str,
+    file: UploadFile = File(...),
+    mode: str = Query("replace", pattern="^(replace|append|upsert)$", description="replace | append | upsert"),
+):
     """
-    Upload custom data as JSON or CSV.
+    Upload custom data as JSON (array, object or NDJSON) or CSV.
     source: crm | support | analytics
+    mode=append adds records with new keys and mode=upsert also updates
+    changed ones, keyed on customer_id, ticket_id or (metric, date).
+    Files over UPLOAD_JOB_THRESHOLD_BYTES are accepted with 202 and
+    ingested in the background; poll GET /upload/jobs/{job_id}.
     """
     if source not in SOURCE_FILES:
         raise HTTPException(status_code=400, detail="source must be crm, support, or analytics")
 
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    file_path = DATA_DIR / SOURCE_FILES[source]
-
-    content = await file.read()
-    try:
-        text = content.decode("utf-8")
-    except UnicodeDecodeError:
-        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    if _upload_size(file) > settings.UPLOAD_JOB_THRESHOLD_BYTES:
+        path = await run_blocking(_spool, file.file)
+        job = job_queue.submit(
+            source, mode, lambda stats: _ingest_spooled(source, path, file.filename, mode, stats)
+        )
+        body = {**job.progress(), "status_url": f"/upload/jobs/{job.id}"}
+        return JSONResponse(status_code=202, content=body)
 
     try:
-        if file.filename and file.filename.lower().endswith(".csv"):
-            data = parse_csv(text)
-        else:
-            data = json.loads(text)
-            if not isinstance(data, list):
-                data = [data]
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
-    except Exception as e:
+        # Parsing and validation are CPU-bound; keep them off the event loop
+        stats = await run_blocking(ingest_upload, source, file.file, file.filename, mode)
+    except ValueError as e:  # IngestError, or stored SQLite rows that repeat keys
         raise HTTPException(status_code=400, detail=str(e))
+    return upload_summary(source, mode, stats)
+
 
-    file_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-    logger.info("Uploaded %d records to %s", len(data), source)
-    return {"status": "ok", "source": source, "records": len(data)}
+@router.get("/jobs/{job_id}")
+def upload_job_status(job_id: str):
+    """Progress of a background upload: rows parsed and rejected, throughput, outcome."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown upload job: {job_id}")
+    return job.progress()
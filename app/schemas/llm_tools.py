@@ -3,13 +3,20 @@
 OpenAI + Anthropic function calling definitions for Universal Data Connector
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel
+
+from app.models.analytics import AnalyticsPoint
+from app.models.crm import CRMCustomer
+from app.models.support import SupportTicket
 
 # TOOL → DATA SOURCE MAPPING (used by llm.py)
 TOOL_TO_SOURCE = {
     "get_crm_data": "crm",
     "get_support_tickets": "support", 
-    "get_analytics": "analytics"
+    "get_analytics": "analytics",
+    "get_customer_tickets": "support+crm"
 }
 
 # Shared parameters across all tools
@@ -25,6 +32,10 @@ COMMON_PARAMS = {
         "description": "Skip results for pagination",
         "minimum": 0
     },
+    "cursor": {
+        "type": "string",
+        "description": "Continue after a previous page: pass metadata.next_cursor (replaces offset)"
+    },
     "voice": {
         "type": "boolean",
         "description": "Voice-optimized (limits results, simple format)",
@@ -41,6 +52,13 @@ CRM_PARAMS = {
     }
 }
 
+CUSTOMER_PARAMS = {
+    "customer_id": {
+        "type": "integer",
+        "description": "Specific customer ID (direct lookup, no paging needed)"
+    }
+}
+
 SUPPORT_PARAMS = {
     "status": {
         "type": "string", 
@@ -54,6 +72,14 @@ SUPPORT_PARAMS = {
     }
 }
 
+JOIN_PARAMS = {
+    "customer_status": {
+        "type": "string",
+        "enum": ["active", "inactive"],
+        "description": "Only tickets from customers with this status"
+    }
+}
+
 ANALYTICS_PARAMS = {
     "metric": {
         "type": "string",
@@ -61,6 +87,16 @@ ANALYTICS_PARAMS = {
     }
 }
 
+def _fields_param(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Projection argument listing the fields a tool's records have"""
+    return {
+        "fields": {
+            "type": "array",
+            "items": {"type": "string", "enum": list(model.model_fields)},
+            "description": "Only return these fields (smaller responses). Voice mode defaults to the essentials."
+        }
+    }
+
 def _openai_tool(name: str, description: str, properties: Dict[str, Any], required: List[str] = None) -> Dict[str, Any]:
     """OpenAI Chat Completions tools format"""
     return {
@@ -99,7 +135,8 @@ def get_openai_tools() -> List[Dict[str, Any]]:
             properties={
                 **COMMON_PARAMS,
                 **CRM_PARAMS,
-                "customer_id": {"type": "string", "description": "Specific customer ID"}
+                **CUSTOMER_PARAMS,
+                **_fields_param(CRMCustomer)
             },
             required=["limit"]
         ),
@@ -107,21 +144,38 @@ def get_openai_tools() -> List[Dict[str, Any]]:
         # 🎫 Support Tickets  
         _openai_tool(
             name="get_support_tickets",
-            description="Get support tickets by status/priority. Use for issue tracking questions.",
+            description="Get support tickets by status/priority/customer. Use for issue tracking questions.",
             properties={
                 **COMMON_PARAMS,
-                **SUPPORT_PARAMS
+                **SUPPORT_PARAMS,
+                **CUSTOMER_PARAMS,
+                **_fields_param(SupportTicket)
             },
             required=["limit"]
         ),
         
+        # 🔗 Tickets joined to their customers
+        _openai_tool(
+            name="get_customer_tickets",
+            description="Get support tickets together with the customer who raised each one, in one call. "
+                        "Use for questions mixing ticket and customer attributes (e.g. high-priority tickets from active customers).",
+            properties={
+                **COMMON_PARAMS,
+                **SUPPORT_PARAMS,
+                **JOIN_PARAMS,
+                **CUSTOMER_PARAMS
+            },
+            required=["limit"]
+        ),
+
         # 📈 Analytics Metrics
         _openai_tool(
             name="get_analytics",
             description="Get business metrics (churn, revenue, DAU). Use for performance questions.",
             properties={
                 **COMMON_PARAMS,
-                **ANALYTICS_PARAMS
+                **ANALYTICS_PARAMS,
+                **_fields_param(AnalyticsPoint)
             },
             required=["limit"]
         )
@@ -0,0 +1,134 @@
+"""
+Admission control for data fetches.
+Each source runs at most a fixed number of fetches at once, and the
+service holds at most a fixed number of admitted fetches (running or
+waiting). Work over budget is shed with OverloadedError, which the API
+turns into a fast 503 + Retry-After instead of a slow timeout. Voice
+requests get reserved capacity and go ahead of waiting bulk requests.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OverloadedError(Exception):
+    """Raised when a fetch is shed; retry_after is the suggested wait in seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Per-source concurrency caps plus a global limit on admitted fetches.
+    voice_reserved slots of every cap (and of the global limit) are only
+    usable by voice requests, so bulk traffic cannot starve voice turns.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        max_queue: int,
+        voice_reserved: int = 0,
+        wait_seconds: float = 1.0,
+        retry_after: int = 1,
+        source_limits: Optional[Mapping[str, int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.voice_reserved = voice_reserved
+        self.wait_seconds = wait_seconds
+        self.retry_after = retry_after
+        self.source_limits = dict(source_limits or {})
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._active: Dict[str, int] = {}
+        self._voice_waiting: Dict[str, int] = {}
+        self._admitted = 0
+        self.shed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.concurrency > 0
+
+    def limit(self, source: str) -> int:
+        """Concurrent fetches allowed for a source."""
+        return self.source_limits.get(source, self.concurrency)
+
+    def _reject(self, source: str, reason: str) -> OverloadedError:
+        self.shed += 1
+        logger.warning(f"Shedding fetch for source={source}: {reason}")
+        return OverloadedError(f"Service overloaded ({reason}); retry shortly", self.retry_after)
+
+    @contextmanager
+    def slot(self, source: str, *, voice: bool = False) -> Iterator[None]:
+        """
+        Hold one of the source's fetch slots for the duration of the block.
+        Waits up to wait_seconds for a slot; raises OverloadedError when the
+        global limit is reached or no slot frees up in time.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        reserve = self.voice_reserved
+        with self._cond:
+            if self._admitted >= (self.max_queue if voice else self.max_queue - reserve):
+                raise self._reject(source, "queue full")
+            self._admitted += 1
+            cap = self.limit(source) if voice else max(1, self.limit(source) - reserve)
+            deadline = self._clock() + self.wait_seconds
+            if voice:
+                self._voice_waiting[source] = self._voice_waiting.get(source, 0) + 1
+            try:
+                # Bulk requests also yield to any voice request waiting on this source
+                while self._active.get(source, 0) >= cap or (not voice and self._voice_waiting.get(source, 0)):
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        self._admitted -= 1
+                        raise self._reject(source, f"{source} at capacity")
+                    self._cond.wait(remaining)
+                self._active[source] = self._active.get(source, 0) + 1
+            finally:
+                if voice:
+                    self._voice_waiting[source] -= 1
+                    self._cond.notify_all()
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active[source] -= 1
+                self._admitted -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load and how many fetches were shed."""
+        with self._cond:
+            return {
+                "enabled": self.enabled,
+                "admitted": self._admitted,
+                "max_queue": self.max_queue,
+                "active": {source: count for source, count in self._active.items() if count},
+                "voice_reserved": self.voice_reserved,
+                "shed": self.shed,
+            }
+
+
+admission = AdmissionController(
+    concurrency=settings.ADMISSION_SOURCE_CONCURRENCY,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    voice_reserved=settings.ADMISSION_VOICE_RESERVED,
+    wait_seconds=settings.ADMISSION_WAIT_SECONDS,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    source_limits=settings.ADMISSION_SOURCE_LIMITS,
+)
@@ -3,8 +3,14 @@ Business rules engine for the Universal Data Connector.
 Applies voice-optimized limits, prioritization, and filtering.
 """
 
+import base64
+import heapq
+import json
 import logging
-from typing import Any, List, Optional
+from datetime import date, datetime
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
 
 from app.config import settings
 from app.models.analytics import AnalyticsPoint
@@ -13,8 +19,11 @@ from app.models.support import SupportTicket
 
 logger = logging.getLogger(__name__)
 
+# Largest page window served by bounded-heap selection instead of a full sort
+TOP_K_SELECTION_MAX = 1000
+
 
-def _sort_key(item: Any) -> Any:
+def recency_key(item: Any) -> Any:
     """Return value for recency ordering (newest first)."""
     if hasattr(item, "created_at"):
         return item.created_at
@@ -23,15 +32,94 @@ def _sort_key(item: Any) -> Any:
     return ""
 
 
-def prioritize_recent(data: List[Any]) -> List[Any]:
+def record_id(item: Any) -> Any:
+    """Identifier used to break recency ties in pagination cursors."""
+    for field in ("ticket_id", "customer_id", "metric"):
+        value = item.get(field) if isinstance(item, dict) else getattr(item, field, None)
+        if value is not None:
+            return value
+    return None
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(item: Any) -> str:
+    """
+    Opaque keyset cursor pointing just past item: base64 of (recency, id)
+    plus the record type, so a cursor is only accepted by its own source.
+    """
+    key = recency_key(item)
+    tag = "t" if isinstance(key, datetime) else "d"
+    payload = json.dumps([tag, key.isoformat(), record_id(item), type(item).__name__], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, model: Optional[Type[BaseModel]] = None) -> Tuple[Any, Any]:
+    """
+    Decode a cursor into its (recency value, id) position. With model, the
+    cursor must also have been issued for that record type.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tag, key, rid, record_type = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if tag not in ("t", "d") or type(rid) not in (int, str):
+            raise ValueError("unexpected cursor fields")
+        value = datetime.fromisoformat(key) if tag == "t" else date.fromisoformat(key)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if model is not None and record_type != model.__name__:
+        raise InvalidCursorError(f"Cursor was issued for another source: {cursor}")
+    return value, rid
+
+
+def _cursor_mismatch(error: TypeError) -> InvalidCursorError:
+    # e.g. a tz-aware cursor against naive timestamps, or a datetime against dates
+    return InvalidCursorError(f"Cursor does not match this source's data: {error}")
+
+
+def seek_after(ordered: Sequence[Any], after: Tuple[Any, Any]) -> int:
+    """
+    Index just past the cursor row in a newest-first sequence.
+    Binary-searches the recency value, then scans its tie run for the id;
+    if the row has since disappeared the whole tie run is skipped.
+    """
+    key, rid = after
+    lo, hi = 0, len(ordered)
+    try:
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if recency_key(ordered[mid]) > key:
+                lo = mid + 1
+            else:
+                hi = mid
+    except TypeError as e:
+        raise _cursor_mismatch(e) from e
+    while lo < len(ordered) and recency_key(ordered[lo]) == key:
+        lo += 1
+        if record_id(ordered[lo - 1]) == rid:
+            return lo
+    return lo
+
+
+def prioritize_recent(data: List[Any], top_k: Optional[int] = None) -> List[Any]:
     """
     Sort data by most recent first.
     Prioritization rule: return most recent/relevant first for voice.
+
+    When top_k is given only the top_k newest items are returned, selected
+    with a bounded heap (O(n log k)) rather than a full sort. Order and
+    tie-breaking match sorted(..., reverse=True)[:top_k].
     """
     if not data:
         return data
+    if top_k is not None and top_k < len(data) and top_k <= TOP_K_SELECTION_MAX:
+        logger.debug(f"Selecting top {top_k} of {len(data)} items by recency")
+        return heapq.nlargest(top_k, data, key=recency_key)
     logger.debug(f"Prioritizing {len(data)} items by recency")
-    return sorted(data, key=_sort_key, reverse=True)
+    ordered = sorted(data, key=recency_key, reverse=True)
+    return ordered if top_k is None else ordered[:top_k]
 
 
 def apply_filters(
@@ -40,14 +128,15 @@ def apply_filters(
     status: Optional[str] = None,
     priority: Optional[str] = None,
     metric: Optional[str] = None,
+    customer_id: Optional[int] = None,
 ) -> List[Any]:
     """
     Apply optional filters based on data structure.
-    CRM: status (active/inactive)
-    Support: status (open/closed), priority (low/medium/high)
+    CRM: status (active/inactive), customer_id
+    Support: status (open/closed), priority (low/medium/high), customer_id
     Analytics: metric name
     """
-    if not status and not priority and not metric:
+    if not status and not priority and not metric and customer_id is None:
         return data
 
     filters = []
@@ -57,6 +146,8 @@ def apply_filters(
         filters.append(f"priority={priority}")
     if metric:
         filters.append(f"metric={metric}")
+    if customer_id is not None:
+        filters.append(f"customer_id={customer_id}")
     logger.info(f"Applying filters: {', '.join(filters)} to {len(data)} items")
 
     result: List[Any] = []
@@ -64,11 +155,15 @@ def apply_filters(
         if isinstance(item, CRMCustomer):
             if status and item.status != status:
                 continue
+            if customer_id is not None and item.customer_id != customer_id:
+                continue
         elif isinstance(item, SupportTicket):
             if status and item.status != status:
                 continue
             if priority and item.priority != priority:
                 continue
+            if customer_id is not None and item.customer_id != customer_id:
+                continue
         elif isinstance(item, AnalyticsPoint):
             if metric and item.metric != metric:
                 continue
@@ -79,6 +174,8 @@ def apply_filters(
                 continue
             if metric and item.get("metric") != metric:
                 continue
+            if customer_id is not None and item.get("customer_id") != customer_id:
+                continue
         result.append(item)
     
     logger.info(f"Filtered {len(data)} items to {len(result)} items")
@@ -97,6 +194,29 @@ def apply_voice_limits(data: List[Any], limit: Optional[int] = None) -> List[Any
     return data[:capped]
 
 
+def apply_cursor(
+    data: List[Any],
+    after: Tuple[Any, Any],
+    limit: Optional[int] = None,
+) -> Tuple[List[Any], bool]:
+    """
+    Keyset pagination over unsorted data: return the page of newest-first
+    items following the cursor position, and whether more items remain.
+    """
+    key = after[0]
+    try:
+        candidates = [item for item in data if recency_key(item) <= key]
+    except TypeError as e:
+        raise _cursor_mismatch(e) from e
+    ties = sum(1 for item in candidates if recency_key(item) == key)
+    window = None if limit is None else ties + limit
+    ordered = prioritize_recent(candidates, top_k=window)
+    start = seek_after(ordered, after)
+    end = None if limit is None else start + limit
+    page = ordered[start:end]
+    return page, start + len(page) < len(candidates)
+
+
 def apply_pagination(
     data: List[Any],
     offset: int = 0,
@@ -109,3 +229,48 @@ def apply_pagination(
     end = start + capped
     logger.debug(f"Paginating: offset={offset}, limit={capped}, returning items {start}-{end} of {len(data)}")
     return data[start:end]
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a projection names fields the records do not have."""
+
+
+def parse_fields(fields: str | Iterable[str] | None) -> Optional[Tuple[str, ...]]:
+    """
+    Normalize a projection given as "a,b" or ["a", "b"] into a tuple of
+    unique names in request order. None or empty means every field.
+    Raises InvalidFieldsError for anything else (e.g. from LLM tool args).
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        names = fields.split(",")
+    elif isinstance(fields, (list, tuple)) and all(isinstance(name, str) for name in fields):
+        names = fields
+    else:
+        raise InvalidFieldsError(f"fields must be a comma-separated string or a list of strings, got {fields!r}")
+    parsed = tuple(dict.fromkeys(name.strip() for name in names if name.strip()))
+    return parsed or None
+
+
+def validate_fields(model: Type[BaseModel], fields: Optional[Sequence[str]]) -> None:
+    """Raise InvalidFieldsError if a projection names fields the model lacks."""
+    unknown = [name for name in fields or () if name not in model.model_fields]
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(model.model_fields)}"
+        )
+
+
+def apply_projection(data: List[Any], fields: Sequence[str]) -> List[Any]:
+    """Keep only the requested fields of each record, returned as dicts."""
+    include = set(fields)
+    result: List[Any] = []
+    for item in data:
+        if isinstance(item, BaseModel):
+            result.append(item.model_dump(include=include))
+        elif isinstance(item, dict):
+            result.append({k: v for k, v in item.items() if k in include})
+        else:
+            result.append(item)
+    return result
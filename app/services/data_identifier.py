@@ -3,7 +3,7 @@ from typing import Any, List
 
 from app.models.analytics import AnalyticsPoint
 from app.models.crm import CRMCustomer
-from app.models.support import SupportTicket
+from app.models.support import SupportTicket, SupportTicketWithCustomer
 
 
 def identify_data_type(data: List[Any]) -> str:
@@ -15,6 +15,8 @@ def identify_data_type(data: List[Any]) -> str:
     # Handle typed Pydantic models
     if isinstance(first, AnalyticsPoint):
         return "time_series_analytics"
+    if isinstance(first, SupportTicketWithCustomer):
+        return "joined_support_crm"
     if isinstance(first, SupportTicket):
         return "tabular_support"
     if isinstance(first, CRMCustomer):
@@ -24,6 +26,8 @@ def identify_data_type(data: List[Any]) -> str:
     if isinstance(first, dict):
         if "date" in first and "metric" in first:
             return "time_series_analytics"
+        if "ticket_id" in first and "customer" in first:
+            return "joined_support_crm"
         if "ticket_id" in first:
             return "tabular_support"
         if "customer_id" in first:
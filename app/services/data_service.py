@@ -2,24 +2,174 @@
 Unified data fetching service used by REST and LLM endpoints.
 """
 
+import asyncio
+import hashlib
 import logging
+import threading
+from concurrent.futures import Executor, Future
+from dataclasses import replace
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Mapping, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
 
 from app.connectors.analytics_connector import AnalyticsConnector
 from app.connectors.crm_connector import CRMConnector
+from app.connectors.base import BaseConnector, QuerySpec
+from app.connectors.sqlite_connector import SQLITE_TABLES, SQLiteConnector
 from app.connectors.support_connector import SupportConnector
 from app.config import settings
 from app.models.common import DataResponse, Metadata
-from app.services.business_rules import apply_filters, apply_pagination, prioritize_recent
-from app.services.data_identifier import identify_data_type
-from app.services.voice_optimizer import get_context_message, get_freshness_message, summarize_if_large
+from app.models.support import SupportTicketWithCustomer
+from app.services.business_rules import (
+    apply_pagination,
+    apply_projection,
+    decode_cursor,
+    encode_cursor,
+    parse_fields,
+    seek_after,
+    validate_fields,
+)
+from app.services.admission import admission
+from app.services.executor import data_executor, run_blocking
+from app.services.response_cache import response_cache
+from app.services.voice_optimizer import (
+    ANALYTICS_AGGREGATION_THRESHOLD,
+    VOICE_DEFAULT_FIELDS,
+    get_context_message,
+    get_freshness_message,
+    summarize_if_large,
+)
 
 logger = logging.getLogger(__name__)
 
-CONNECTOR_MAP = {
-    "crm": CRMConnector(),
-    "support": SupportConnector(),
-    "analytics": AnalyticsConnector(),
-}
+
+def build_connectors() -> dict:
+    """Create one connector per source for the configured storage backend."""
+    if settings.STORAGE_BACKEND == "sqlite":
+        return {source: SQLiteConnector(source) for source in SQLITE_TABLES}
+    return {
+        "crm": CRMConnector(),
+        "support": SupportConnector(),
+        "analytics": AnalyticsConnector(),
+    }
+
+
+CONNECTOR_MAP = build_connectors()
+
+
+def pin_connectors() -> Dict[str, BaseConnector]:
+    """Connectors bound to the current snapshot of every source."""
+    return {source: connector.pinned() for source, connector in CONNECTOR_MAP.items()}
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key runs
+    the computation, callers arriving while it is in flight wait for and
+    share its result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                logger.debug(f"Joining in-flight computation for {key}")
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[[], Any]) -> Any:
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        return self._run(key, future, fn)
+
+    def submit(self, key: Hashable, fn: Callable[[], Any], executor: Executor) -> Future:
+        """
+        Non-blocking do(): returns a future for the shared result. A leader's
+        computation runs on executor; followers only hold the future, not a
+        worker thread.
+        """
+        future, leader = self._join(key)
+        if leader:
+            def run() -> None:
+                try:
+                    self._run(key, future, fn)
+                except BaseException:
+                    pass  # already delivered through the future
+
+            executor.submit(run)
+        return future
+
+
+_in_flight = SingleFlight()
+
+
+def build_spec(
+    *,
+    limit: int | None = None,
+    offset: int = 0,
+    status: str | None = None,
+    priority: str | None = None,
+    metric: str | None = None,
+    customer_id: int | None = None,
+    voice: bool = False,
+    cursor: str | None = None,
+    fields: str | Iterable[str] | None = None,
+    model: Type[BaseModel] | None = None,
+) -> QuerySpec:
+    """
+    Normalize request parameters into the QuerySpec fetch_data runs.
+    Voice mode always serves the first MAX_RESULTS items. model is the
+    source's record type; cursors issued for another type are rejected.
+    """
+    effective_limit = settings.MAX_RESULTS if voice else (limit or settings.DEFAULT_PAGE_SIZE)
+    effective_offset = 0 if voice else offset
+    return QuerySpec.build(
+        status=status,
+        priority=priority,
+        metric=metric,
+        customer_id=customer_id,
+        offset=effective_offset,
+        limit=min(effective_limit, settings.MAX_PAGE_SIZE),
+        fields=parse_fields(fields),
+        after=decode_cursor(cursor, model) if cursor else None,
+    )
+
+
+def data_etag(source: str, *, voice: bool = False, response_format: str = "json", **params: Any) -> str | None:
+    """
+    Weak ETag for a fetch_data request: a digest of the source's snapshot
+    version, the normalized query and the response format. Weak because
+    the body also carries metadata.data_freshness, a timestamp that differs
+    between otherwise identical responses. None when the version is unknown.
+    """
+    connector = CONNECTOR_MAP.get(source)
+    if connector is None:
+        return None
+    version = connector.version()
+    if version is None:
+        return None
+    spec = build_spec(voice=voice, model=getattr(connector, "model", None), **params)
+    digest = hashlib.sha256(repr((source, version, spec, voice, response_format)).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
 
 
 def fetch_data(
@@ -30,20 +180,87 @@ def fetch_data(
     status: str | None = None,
     priority: str | None = None,
     metric: str | None = None,
+    customer_id: int | None = None,
     voice: bool = False,
+    cursor: str | None = None,
+    fields: str | Iterable[str] | None = None,
+    connectors: Mapping[str, BaseConnector] | None = None,
 ) -> DataResponse:
     """
     Fetch, filter, and optimize data from the specified source.
+    A cursor from a previous page's metadata.next_cursor replaces offset.
+    fields restricts each record to the named fields; voice mode defaults
+    to VOICE_DEFAULT_FIELDS for the data type.
+    connectors overrides CONNECTOR_MAP, e.g. with pinned snapshots.
+    Raises InvalidCursorError for a malformed cursor, InvalidFieldsError
+    for unknown fields and OverloadedError when the fetch is shed.
     """
     logger.info(
         f"Fetching data from source={source}, limit={limit}, offset={offset}, "
-        f"status={status}, priority={priority}, metric={metric}, voice={voice}"
+        f"status={status}, priority={priority}, metric={metric}, customer_id={customer_id}, "
+        f"voice={voice}, cursor={cursor}, fields={fields}"
     )
-    
-    connector = CONNECTOR_MAP.get(source)
+    plan = _plan_fetch(
+        source,
+        connectors,
+        limit=limit,
+        offset=offset,
+        status=status,
+        priority=priority,
+        metric=metric,
+        customer_id=customer_id,
+        voice=voice,
+        cursor=cursor,
+        fields=fields,
+    )
+    if plan.response is not None:
+        return plan.response
+    # Identical requests arriving together share one computation
+    return _in_flight.do(plan.key, plan.compute)
+
+
+async def afetch_data(
+    source: str,
+    *,
+    connectors: Mapping[str, BaseConnector] | None = None,
+    **params: Any,
+) -> DataResponse:
+    """
+    fetch_data for async routes; takes the same keyword arguments.
+    Planning runs on the bounded data executor, since connector.version()
+    may load a snapshot or query SQLite. Misses run there too, and callers
+    joining an identical in-flight fetch await it without occupying a worker.
+    Misses bypass BaseConnector.aquery because the query has to run inside
+    the shared, coalesced computation, which is already on the executor.
+    A cancelled caller stops waiting; the shared fetch still completes for
+    everyone else waiting on it.
+    """
+    logger.info(f"Fetching data (async) from source={source}, params={params}")
+    plan = await run_blocking(_plan_fetch, source, connectors, **params)
+    if plan.response is not None:
+        return plan.response
+    shared = _in_flight.submit(plan.key, plan.compute, data_executor)
+    return await asyncio.shield(asyncio.wrap_future(shared))
+
+
+class _FetchPlan(NamedTuple):
+    key: Hashable
+    response: Optional[DataResponse]  # set when no computation is needed
+    compute: Optional[Callable[[], DataResponse]]
+
+
+def _plan_fetch(
+    source: str,
+    connectors: Mapping[str, BaseConnector] | None,
+    *,
+    voice: bool = False,
+    **params: Any,
+) -> _FetchPlan:
+    """Resolve the connector and spec, and answer from the cache if possible."""
+    connector = (connectors or CONNECTOR_MAP).get(source)
     if not connector:
         logger.warning(f"Unknown data source: {source}")
-        return DataResponse(
+        empty = DataResponse(
             data=[],
             metadata=Metadata(
                 total_results=0,
@@ -54,21 +271,46 @@ def fetch_data(
                 context_message="No results",
             ),
         )
+        return _FetchPlan(None, empty, None)
 
-    raw_data = connector.fetch()
-    data_type = identify_data_type(raw_data)
-    logger.debug(f"Identified data type: {data_type}, raw count: {len(raw_data)}")
+    spec = build_spec(voice=voice, model=getattr(connector, "model", None), **params)
+    if spec.fields:
+        validate_fields(connector.model, spec.fields)
 
-    filtered = apply_filters(
-        raw_data,
-        status=status,
-        priority=priority,
-        metric=metric,
-    )
-    total_after_filter = len(filtered)
-    filtered = prioritize_recent(filtered)
+    # Normalized spec + snapshot version: equivalent requests share an entry
+    version = connector.version()
+    key = (source, version, spec, voice)
+    cacheable = response_cache.enabled and version is not None
+    if cacheable:
+        cached = response_cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached response for source={source}")
+            return _FetchPlan(key, cached, None)
+
+    def compute() -> DataResponse:
+        # Only the leader of a coalesced fetch takes a slot; cache hits take none
+        with admission.slot(source, voice=voice):
+            response = _query_source(source, connector, spec, voice)
+        if cacheable:
+            response_cache.put(key, response)
+        return response
 
-    optimized = summarize_if_large(filtered, data_type)
+    return _FetchPlan(key, None, compute)
+
+
+def _query_source(source: str, connector: BaseConnector, spec: QuerySpec, voice: bool) -> DataResponse:
+    """Run a spec against a connector and shape the voice-aware response."""
+    result = connector.query(spec)
+    data_type = result.data_type
+    total_after_filter = result.total
+    logger.debug(f"Identified data type: {data_type}, matching count: {total_after_filter}")
+
+    if data_type == "time_series_analytics" and total_after_filter > ANALYTICS_AGGREGATION_THRESHOLD:
+        # Aggregation needs every matching point, not just the requested page
+        everything = connector.query(replace(spec, offset=0, limit=None, after=None, fields=None))
+        optimized = summarize_if_large(everything.records, data_type)
+    else:
+        optimized = result.records
     is_summarized = (
         len(optimized) == 1
         and isinstance(optimized[0], dict)
@@ -79,12 +321,13 @@ def fetch_data(
         logger.info("Returning aggregated summary for large analytics dataset")
         final_data = optimized
         returned_count = 1
+        next_cursor = None
     else:
-        effective_limit = settings.MAX_RESULTS if voice else (limit or settings.DEFAULT_PAGE_SIZE)
-        effective_offset = 0 if voice else offset
-        paginated = apply_pagination(filtered, offset=effective_offset, limit=effective_limit)
-        final_data = paginated
-        returned_count = len(paginated)
+        final_data = result.records
+        returned_count = len(result.records)
+        next_cursor = result.next_cursor
+        if voice and not spec.fields and data_type in VOICE_DEFAULT_FIELDS:
+            final_data = apply_projection(final_data, VOICE_DEFAULT_FIELDS[data_type])
 
     context_msg = get_context_message(returned_count, total_after_filter)
     voice_summary = None
@@ -107,6 +350,8 @@ def fetch_data(
         source=source,
         context_message=context_msg,
         voice_summary=voice_summary,
+        next_cursor=next_cursor,
+        snapshot_version=result.snapshot_version,
     )
 
     logger.info(
@@ -114,3 +359,94 @@ def fetch_data(
         f"type={data_type}, voice={voice}"
     )
     return DataResponse(data=final_data, metadata=metadata)
+
+
+def fetch_joined(
+    *,
+    limit: int | None = None,
+    offset: int = 0,
+    status: str | None = None,
+    priority: str | None = None,
+    customer_status: str | None = None,
+    customer_id: int | None = None,
+    voice: bool = False,
+    cursor: str | None = None,
+    connectors: Mapping[str, BaseConnector] | None = None,
+) -> DataResponse:
+    """
+    Join support tickets to CRM customers on customer_id (inner hash join).
+    status/priority filter tickets, customer_status filters customers, and
+    customer_id restricts both sides. Results are newest tickets first.
+    """
+    logger.info(
+        f"Joining support tickets to CRM customers: status={status}, priority={priority}, "
+        f"customer_status={customer_status}, customer_id={customer_id}, limit={limit}, "
+        f"offset={offset}, voice={voice}"
+    )
+
+    connectors = connectors or CONNECTOR_MAP
+    with admission.slot("support+crm", voice=voice):
+        # Build side: the (smaller) filtered customer set, hashed on customer_id
+        customers = connectors["crm"].query(
+            QuerySpec.build(status=customer_status, customer_id=customer_id, order_by=None)
+        ).records
+        by_id = {customer.customer_id: customer for customer in customers}
+
+        # Probe side: filtered tickets, already newest first
+        tickets = connectors["support"].query(
+            QuerySpec.build(status=status, priority=priority, customer_id=customer_id)
+        ).records
+    matched = [ticket for ticket in tickets if ticket.customer_id in by_id]
+    total = len(matched)
+
+    effective_limit = settings.MAX_RESULTS if voice else (limit or settings.DEFAULT_PAGE_SIZE)
+    effective_offset = 0 if voice else offset
+    if cursor:
+        effective_offset = seek_after(matched, decode_cursor(cursor, SupportTicketWithCustomer))
+    page = apply_pagination(matched, offset=effective_offset, limit=effective_limit)
+    has_more = effective_offset + len(page) < total
+    # Both sides are already validated, so construct without re-validation
+    joined = [
+        SupportTicketWithCustomer.model_construct(**dict(ticket), customer=by_id[ticket.customer_id])
+        for ticket in page
+    ]
+
+    context_msg = get_context_message(len(joined), total)
+    voice_summary = None
+    if voice and total > 0:
+        customer_count = len({ticket.customer_id for ticket in matched})
+        voice_summary = f"{total} tickets from {customer_count} customers. {context_msg}"
+
+    metadata = Metadata(
+        total_results=total,
+        returned_results=len(joined),
+        data_freshness=get_freshness_message(),
+        data_type="joined_support_crm",
+        source="support+crm",
+        context_message=context_msg,
+        voice_summary=voice_summary,
+        # Tagged with the joined type, so support and join cursors are not interchangeable
+        next_cursor=encode_cursor(joined[-1]) if has_more and joined else None,
+    )
+    logger.info(f"Join complete: returned={len(joined)}/{total}, voice={voice}")
+    return DataResponse(data=joined, metadata=metadata)
+
+
+def stream_data(
+    source: str,
+    *,
+    status: str | None = None,
+    priority: str | None = None,
+    metric: str | None = None,
+    customer_id: int | None = None,
+    connectors: Mapping[str, BaseConnector] | None = None,
+) -> Iterator[Any]:
+    """
+    Every record of a source matching the filters, newest first, as a lazy
+    iterator for exports. Raises KeyError for an unknown source.
+    """
+    connector = (connectors or CONNECTOR_MAP)[source]
+    spec = QuerySpec.build(status=status, priority=priority, metric=metric, customer_id=customer_id)
+    logger.info(f"Streaming {source} with filters={spec.filters}")
+    # Pin first so the export reads one snapshot even if an upload lands midway
+    return connector.pinned().stream(spec)
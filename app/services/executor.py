@@ -0,0 +1,26 @@
+"""
+Bounded executor for the blocking half of the data plane: file reads,
+JSON parsing and pydantic validation. Async routes hand that work to a
+fixed number of threads, so a slow dataset load can occupy at most
+DATA_EXECUTOR_WORKERS of them and never the event loop itself.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+data_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.DATA_EXECUTOR_WORKERS),
+    thread_name_prefix="data",
+)
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable on the data executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(data_executor, functools.partial(fn, *args, **kwargs))
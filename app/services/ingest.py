@@ -0,0 +1,279 @@
+"""
+Streaming upload ingestion.
+Uploads are decoded, parsed, validated and written chunk by chunk, so
+peak memory is bounded by the chunk size and the storage batch rather
+than by the size of the file. CSV, JSON arrays, single JSON objects and
+NDJSON are supported.
+"""
+
+import codecs
+import csv
+import json
+import logging
+from dataclasses import dataclass, field
+from itertools import chain
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.connectors.base import dataset_version, file_key, mark_trusted
+from app.connectors.snapshot_file import SnapshotWriter, snapshot_file_path
+from app.utils.files import atomic_write
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Rejected rows reported back in full; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+# Longest single JSON value buffered while waiting for it to complete
+MAX_VALUE_CHARS = 1 << 20
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class IngestError(ValueError):
+    """Raised when an upload cannot be decoded or parsed."""
+
+
+@dataclass
+class IngestStats:
+    """Row counts for one upload."""
+
+    accepted: int = 0
+    rejected: int = 0
+    errors: List[str] = field(default_factory=list)
+    # How accepted rows landed: new keys, changed rows, identical rows
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def reject(self, row_number: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"row {row_number}: {message}")
+
+
+def describe_error(error: ValidationError) -> str:
+    """One-line summary of a row's validation errors."""
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors())
+
+
+def iter_text(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Decode a binary stream as UTF-8 in chunks (a BOM is dropped)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    yield tail
+                return
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+    except UnicodeDecodeError as e:
+        raise IngestError("File must be UTF-8 encoded") from e
+
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Re-split text chunks into lines, keeping line endings. Only "\n" ends
+    a line, as for a file opened with newline=""; csv handles "\r" itself,
+    and str.splitlines would also break on characters like U+2028 that
+    are ordinary text inside a field.
+    """
+    pending = ""
+    for chunk in chunks:
+        buffer = pending + chunk
+        start = 0
+        end = buffer.find("\n")
+        while end >= 0:
+            yield buffer[start:end + 1]
+            start = end + 1
+            end = buffer.find("\n", start)
+        pending = buffer[start:]
+    if pending:
+        yield pending
+
+
+def iter_csv_rows(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """CSV rows as dicts keyed by the header row."""
+    try:
+        yield from csv.DictReader(iter_lines(chunks))
+    except csv.Error as e:
+        raise IngestError(f"Invalid CSV: {e}") from e
+
+
+def iter_json_rows(chunks: Iterable[str]) -> Iterator[Any]:
+    """
+    Rows of a JSON array, or of a sequence of top-level JSON values (a
+    single object or NDJSON), decoded incrementally with raw_decode.
+    """
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    exhausted = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, exhausted
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip(separators: str) -> Optional[str]:
+        """Advance past separators; return the next character, or None at end of input."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in separators:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return None
+
+    first = skip(_WHITESPACE)
+    if first is None:
+        return
+    in_array = first == "["
+    if in_array:
+        pos += 1
+    separators = _WHITESPACE + "," if in_array else _WHITESPACE
+
+    while True:
+        char = skip(separators)
+        if char is None:
+            if in_array:
+                raise IngestError("Invalid JSON: unterminated array")
+            return
+        if in_array and char == "]":
+            pos += 1
+            if skip(_WHITESPACE) is not None:
+                raise IngestError("Invalid JSON: data after closing bracket")
+            return
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # The value may just be cut off at the chunk boundary
+                if len(buffer) - pos <= MAX_VALUE_CHARS and not exhausted and fill():
+                    continue
+                raise IngestError(f"Invalid JSON: {e}") from e
+            if end == len(buffer) and not exhausted and not isinstance(value, (dict, list)):
+                # A scalar ending at the boundary may continue in the next chunk
+                if fill():
+                    continue
+            break
+        pos = end
+        yield value
+
+
+def iter_rows(stream: BinaryIO, filename: Optional[str]) -> Iterator[Any]:
+    """Parse an upload by file extension: .csv is CSV, anything else JSON."""
+    chunks = iter_text(stream)
+    if filename and filename.lower().endswith(".csv"):
+        return iter_csv_rows(chunks)
+    return iter_json_rows(chunks)
+
+
+def validate_rows(rows: Iterable[Any], model: Type[BaseModel], stats: IngestStats) -> Iterator[BaseModel]:
+    """Validate rows one at a time, counting and skipping the invalid ones."""
+    for row_number, row in enumerate(rows, start=1):
+        try:
+            record = model.model_validate(row)
+        except ValidationError as e:
+            stats.reject(row_number, describe_error(e))
+            continue
+        stats.accepted += 1
+        yield record
+
+
+def peek(records: Iterator[Any]) -> Optional[Iterator[Any]]:
+    """The same iterator with its first item pulled forward, or None if empty."""
+    first = next(records, None)
+    if first is None:
+        return None
+    return chain((first,), records)
+
+
+def merge_records(
+    existing: Sequence[BaseModel],
+    incoming: Iterable[BaseModel],
+    key_fields: Sequence[str],
+    stats: IngestStats,
+    *,
+    update: bool = True,
+) -> Tuple[List[BaseModel], List[int]]:
+    """
+    Merge incoming records into a copy of existing by key. New keys are
+    appended; with update=True (upsert) a differing record replaces the
+    stored one in place, otherwise (append) it is ignored. Returns the
+    merged list and the positions that changed.
+    """
+    key_of = attrgetter(*key_fields)
+    positions = {key_of(record): position for position, record in enumerate(existing)}
+    records = list(existing)
+    changed: List[int] = []
+    for record in incoming:
+        key = key_of(record)
+        position = positions.get(key)
+        if position is None:
+            positions[key] = len(records)
+            changed.append(len(records))
+            records.append(record)
+            stats.inserted += 1
+        elif update and records[position] != record:
+            records[position] = record
+            changed.append(position)
+            stats.updated += 1
+        else:
+            stats.unchanged += 1
+    return records, changed
+
+
+def write_json_records(path: Path, records: Iterable[BaseModel]) -> int:
+    """
+    Stream records into a JSON array, one record per line, through a
+    temporary file that replaces path only once it is complete. The file's
+    dataset version is then bumped and it is marked trusted, and the binary
+    snapshot file collected along the way is written next to it, so loads
+    skip re-validating and re-parsing it.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    model: Optional[Type[BaseModel]] = None
+    snapshot: Optional[SnapshotWriter] = None
+    with atomic_write(path) as out:
+        out.write(b"[")
+        for record in records:
+            if written == 0:
+                model = type(record)
+                snapshot = SnapshotWriter.for_model(model)
+            out.write(b"\n" if written == 0 else b",\n")
+            out.write(record.__pydantic_serializer__.to_json(record))
+            if snapshot is not None:
+                snapshot.add(record)
+            written += 1
+        out.write(b"\n]\n")
+    dataset_version(path, file_key(path))
+    if model is not None:  # an empty file has nothing to trust
+        mark_trusted(path, model)
+    _write_snapshot_file(path, snapshot)
+    return written
+
+
+def _write_snapshot_file(path: Path, snapshot: Optional[SnapshotWriter]) -> None:
+    # The JSON file is authoritative; a missing snapshot file only costs load time
+    snapshot_path = snapshot_file_path(path)
+    try:
+        if snapshot is None or not snapshot.write(snapshot_path, file_key(path)):
+            snapshot_path.unlink(missing_ok=True)
+    except (OSError, ValueError, OverflowError) as e:
+        logger.warning(f"Could not write snapshot file for {path}: {e}")
@@ -0,0 +1,108 @@
+"""
+In-process background jobs for large uploads.
+The upload request only spools the file and returns a job id; a small
+worker pool parses, validates and publishes it while clients poll the
+job's progress.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+from app.services.ingest import IngestStats
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for polling before the oldest are forgotten
+MAX_FINISHED_JOBS = 100
+
+
+@dataclass
+class IngestJob:
+    """One background upload and its live progress."""
+
+    id: str
+    source: str
+    mode: str
+    status: str = "queued"  # queued | running | succeeded | failed
+    stats: IngestStats = field(default_factory=IngestStats)
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Any] = None
+
+    def progress(self) -> Dict[str, Any]:
+        """Snapshot of the job for the status endpoint."""
+        parsed = self.stats.accepted + self.stats.rejected
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "job_id": self.id,
+            "source": self.source,
+            "mode": self.mode,
+            "status": self.status,
+            "rows_parsed": parsed,
+            "rows_rejected": self.stats.rejected,
+            "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+            "rows_per_second": round(parsed / elapsed, 1) if elapsed else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Runs ingest jobs on a bounded worker pool and remembers recent ones.
+    """
+
+    def __init__(self, workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ingest")
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, source: str, mode: str, work: Callable[[IngestStats], Dict[str, Any]]) -> IngestJob:
+        """
+        Queue work(stats) as a job. work updates stats as rows stream past
+        and returns the job's result, or raises to fail it.
+        """
+        job = IngestJob(id=uuid.uuid4().hex, source=source, mode=mode)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_finished()
+        self._executor.submit(self._run, job, work)
+        logger.info(f"Queued ingest job {job.id} for source={source}, mode={mode}")
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: IngestJob, work: Callable[[IngestStats], Dict[str, Any]]) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = work(job.stats)
+            job.status = "succeeded"
+        except Exception as e:
+            job.error = getattr(e, "detail", None) or str(e)
+            job.status = "failed"
+            logger.warning(f"Ingest job {job.id} failed: {job.error}")
+        finally:
+            job.finished_at = time.time()
+        logger.info(f"Ingest job {job.id} {job.status}: {job.progress()['rows_parsed']} rows")
+
+    def _forget_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+job_queue = JobQueue(settings.INGEST_JOB_WORKERS)
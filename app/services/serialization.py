@@ -0,0 +1,153 @@
+"""
+Fast JSON rendering for DataResponse payloads.
+
+Routes that return DataResponse through response_model make FastAPI
+re-validate every record that fetch_data already built and then encode
+it again. This module serializes a DataResponse straight to bytes once,
+with list serializers precompiled per record model, and memoizes the
+bytes on the response so cached responses are never re-encoded.
+
+The columnar format sends field names once instead of once per record:
+{"columns": [...], "rows": [[...], ...], "metadata": {...}}.
+"""
+
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.models.analytics import AnalyticsPoint
+from app.models.common import DataResponse, Metadata
+from app.models.crm import CRMCustomer
+from app.models.support import SupportTicket, SupportTicketWithCustomer
+
+# Compiled once at import; serializing a typed list skips per-item type inference
+_LIST_ADAPTERS: Dict[Type[BaseModel], TypeAdapter] = {
+    model: TypeAdapter(List[model])
+    for model in (CRMCustomer, SupportTicket, SupportTicketWithCustomer, AnalyticsPoint)
+}
+_ANY_LIST = TypeAdapter(List[Any])
+_ANY = TypeAdapter(Any)
+# Row serializers for the columnar format: one typed tuple per record
+_ROW_ADAPTERS: Dict[Type[BaseModel], TypeAdapter] = {
+    model: TypeAdapter(List[Tuple[tuple(field.annotation for field in model.model_fields.values())]])
+    for model in _LIST_ADAPTERS
+}
+
+
+def render_data(data: List[Any]) -> bytes:
+    """Serialize a list of records to JSON bytes."""
+    if data:
+        record_type = type(data[0])
+        adapter = _LIST_ADAPTERS.get(record_type)
+        if adapter is not None and all(type(item) is record_type for item in data):
+            return adapter.dump_json(data)
+    return _ANY_LIST.dump_json(data)
+
+
+def iter_ndjson(records: Iterable[Any], batch_size: int = 500) -> Iterator[bytes]:
+    """
+    Encode records as newline-delimited JSON, yielding one chunk per batch
+    so only batch_size records are held at a time.
+    """
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield b"".join(_render_line(item) for item in batch)
+
+
+def _render_line(item: Any) -> bytes:
+    if isinstance(item, BaseModel):
+        return item.__pydantic_serializer__.to_json(item) + b"\n"
+    return _ANY.dump_json(item) + b"\n"
+
+
+def render_data_response(response: DataResponse) -> bytes:
+    """Serialize a DataResponse to the same JSON FastAPI would emit, once."""
+    if response._rendered is None:
+        response._rendered = b"".join(
+            (
+                b'{"data":',
+                render_data(response.data),
+                b',"metadata":',
+                Metadata.__pydantic_serializer__.to_json(response.metadata),
+                b"}",
+            )
+        )
+    return response._rendered
+
+
+def to_columns(data: List[Any]) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    """
+    Split records into column names and value rows. Models of one type
+    are read field by field without dumping them first; dicts
+    (projections, aggregates) use the union of their keys, in order.
+    """
+    if not data:
+        return [], []
+    record_type = type(data[0])
+    if issubclass(record_type, BaseModel) and all(type(item) is record_type for item in data):
+        columns = list(record_type.model_fields)
+        if len(columns) == 1:
+            return columns, [(item.__dict__[columns[0]],) for item in data]
+        # Field values live in the instance __dict__; itemgetter beats getattr
+        getter = itemgetter(*columns)
+        return columns, [getter(item.__dict__) for item in data]
+
+    rows = [item.model_dump() if isinstance(item, BaseModel) else item for item in data]
+    columns = list(dict.fromkeys(key for row in rows if isinstance(row, dict) for key in row))
+    return columns, [
+        tuple(row.get(column) for column in columns) if isinstance(row, dict) else (row,) for row in rows
+    ]
+
+
+def render_columnar_response(response: DataResponse) -> bytes:
+    """Serialize a DataResponse in the columnar format, once."""
+    if response._rendered_columnar is None:
+        columns, rows = to_columns(response.data)
+        data = response.data
+        adapter = _ROW_ADAPTERS.get(type(data[0])) if data else None
+        if adapter is None or not all(type(item) is type(data[0]) for item in data):
+            adapter = _ANY
+        response._rendered_columnar = b"".join(
+            (
+                b'{"columns":',
+                _ANY.dump_json(columns),
+                b',"rows":',
+                adapter.dump_json(rows),
+                b',"metadata":',
+                Metadata.__pydantic_serializer__.to_json(response.metadata),
+                b"}",
+            )
+        )
+    return response._rendered_columnar
+
+
+class DataJSONResponse(Response):
+    """JSON response for DataResponse payloads, skipping response_model re-validation."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, DataResponse):
+            return render_data_response(content)
+        return super().render(content)
+
+
+class ColumnarJSONResponse(DataJSONResponse):
+    """DataResponse payloads in the columnar format."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, DataResponse):
+            return render_columnar_response(content)
+        return super().render(content)
+
+
+RESPONSE_FORMATS: Dict[str, Type[DataJSONResponse]] = {
+    "json": DataJSONResponse,
+    "columnar": ColumnarJSONResponse,
+}
@@ -4,13 +4,20 @@ Summarization and context messages for voice conversations.
 """
 
 from datetime import UTC, datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 from app.models.analytics import AnalyticsPoint
 
 # Threshold above which we aggregate analytics instead of returning raw points
 ANALYTICS_AGGREGATION_THRESHOLD = 20
 
+# Fields read aloud by default in voice mode when the caller asks for none;
+# data types not listed keep every field
+VOICE_DEFAULT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "tabular_crm": ("customer_id", "name", "status"),
+    "tabular_support": ("ticket_id", "customer_id", "subject", "priority", "status"),
+}
+
 
 def aggregate_analytics(data: List[Any]) -> Dict[str, Any]:
     """
@@ -43,7 +43,22 @@ async function apiUpload(path, formData) {
     body: formData,
   });
   if (!res.ok) throw new Error(await res.text().catch(() => res.statusText));
-  return res.json();
+  // 202: a large upload accepted as a background job; the body describes the job
+  return { status: res.status, body: await res.json() };
+}
+
+const JOB_POLL_MS = 1000;
+
+async function waitForUploadJob(statusUrl) {
+  for (;;) {
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_MS));
+    const job = await apiGet(statusUrl);
+    if (job.status === 'succeeded') return job.result;
+    if (job.status === 'failed') {
+      const error = job.error;
+      throw new Error(error?.message || (typeof error === 'string' ? error : JSON.stringify(error)) || 'Upload failed');
+    }
+  }
 }
 
 async function checkApi() {
@@ -192,9 +207,14 @@ async function uploadData() {
   formData.append('file', fileInput.files[0]);
 
   try {
-    const res = await apiUpload(`/upload/${source}`, formData);
-    toast(`Uploaded ${res.records} records`, 'success');
+    const { status, body } = await apiUpload(`/upload/${source}`, formData);
     fileInput.value = '';
+    let result = body;
+    if (status === 202) {
+      toast('Large upload queued; processing in the background', 'success');
+      result = await waitForUploadJob(body.status_url);
+    }
+    toast(`Uploaded ${result.records} records (${result.rejected} rejected)`, 'success');
   } catch (e) {
     toast(e.message || 'Upload failed', 'error');
   } finally {
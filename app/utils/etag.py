@@ -0,0 +1,24 @@
+"""
+Conditional-request helpers for ETag / If-None-Match handling.
+"""
+
+import hashlib
+
+
+def compute_etag(payload: bytes) -> str:
+    """Strong ETag for a byte payload."""
+    return f'"{hashlib.sha256(payload).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    """
+    True when an If-None-Match header matches the current ETag.
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match.
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == opaque for tag in candidates)
@@ -0,0 +1 @@
+"""Micro-benchmarks for the Universal Data Connector hot paths."""
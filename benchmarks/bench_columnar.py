@@ -0,0 +1,42 @@
+"""
+Benchmark: row-object JSON vs the columnar encoding for a 50-item page,
+comparing payload size and serialization time.
+
+Run from the project root:
+    python -m benchmarks.bench_columnar
+"""
+
+import json
+import timeit
+
+from app.models.common import DataResponse, Metadata
+from app.models.support import SupportTicket
+from app.services.serialization import render_columnar_response, render_data_response
+from app.utils.mock_data import generate_support_tickets
+
+
+def main(page_size: int = 50, number: int = 2_000) -> None:
+    tickets = [SupportTicket.model_validate(t) for t in generate_support_tickets(page_size)]
+    metadata = Metadata(total_results=500, returned_results=page_size, data_freshness="now", source="support")
+
+    def fresh() -> DataResponse:
+        return DataResponse(data=tickets, metadata=metadata)
+
+    rows_payload = render_data_response(fresh())
+    columnar_payload = render_columnar_response(fresh())
+    decoded = json.loads(columnar_payload)
+    assert [dict(zip(decoded["columns"], row)) for row in decoded["rows"]] == json.loads(rows_payload)["data"]
+
+    rows_time = min(timeit.repeat(lambda: render_data_response(fresh()), number=number, repeat=5)) / number
+    columnar_time = min(timeit.repeat(lambda: render_columnar_response(fresh()), number=number, repeat=5)) / number
+
+    print(f"{page_size}-item support page")
+    print(f"  row objects : {len(rows_payload):6d} bytes  {rows_time * 1e6:8.1f} us")
+    print(
+        f"  columnar    : {len(columnar_payload):6d} bytes  {columnar_time * 1e6:8.1f} us  "
+        f"({1 - len(columnar_payload) / len(rows_payload):.0%} smaller)"
+    )
+
+
+if __name__ == "__main__":
+    main()
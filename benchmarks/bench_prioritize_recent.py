@@ -0,0 +1,30 @@
+"""
+Benchmark: full sort vs bounded-heap top-k in prioritize_recent.
+
+Run from the project root:
+    python -m benchmarks.bench_prioritize_recent [ticket_count]
+"""
+
+import sys
+import timeit
+
+from app.models.support import SupportTicket
+from app.services.business_rules import prioritize_recent
+from app.utils.mock_data import generate_support_tickets
+
+
+def main(count: int = 500_000) -> None:
+    tickets = [SupportTicket.model_validate(t) for t in generate_support_tickets(count)]
+    window = 50  # offset + limit of the largest page fetch_data serves
+    assert prioritize_recent(tickets, top_k=window) == prioritize_recent(tickets)[:window]
+
+    runs = 5
+    full = min(timeit.repeat(lambda: prioritize_recent(tickets)[:window], number=1, repeat=runs))
+    top_k = min(timeit.repeat(lambda: prioritize_recent(tickets, top_k=window), number=1, repeat=runs))
+    print(f"{count} tickets, window={window}, best of {runs}")
+    print(f"  full sort : {full * 1000:8.1f} ms")
+    print(f"  top-k heap: {top_k * 1000:8.1f} ms  ({full / top_k:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,47 @@
+"""
+Benchmark: FastAPI response_model path vs the fast DataResponse renderer
+for a 50-item page.
+
+Run from the project root:
+    python -m benchmarks.bench_serialization
+"""
+
+import json
+import timeit
+
+from app.models.common import DataResponse, Metadata
+from app.models.support import SupportTicket
+from app.services.serialization import render_data_response
+from app.utils.mock_data import generate_support_tickets
+
+
+def response_model_path(response: DataResponse) -> bytes:
+    """What FastAPI does for response_model=DataResponse: dump, re-validate, encode."""
+    validated = DataResponse.model_validate(response.model_dump())
+    content = validated.model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def main(page_size: int = 50, number: int = 2_000) -> None:
+    tickets = [SupportTicket.model_validate(t) for t in generate_support_tickets(page_size)]
+    metadata = Metadata(total_results=500, returned_results=page_size, data_freshness="now", source="support")
+
+    def fresh() -> DataResponse:
+        return DataResponse(data=tickets, metadata=metadata)
+
+    assert json.loads(response_model_path(fresh())) == json.loads(render_data_response(fresh()))
+
+    slow = min(timeit.repeat(lambda: response_model_path(fresh()), number=number, repeat=5)) / number
+    fast = min(timeit.repeat(lambda: render_data_response(fresh()), number=number, repeat=5)) / number
+    cached_response = fresh()
+    render_data_response(cached_response)
+    cached = min(timeit.repeat(lambda: render_data_response(cached_response), number=number, repeat=5)) / number
+
+    print(f"{page_size}-item support page, per response")
+    print(f"  response_model path : {slow * 1e6:8.1f} us")
+    print(f"  fast renderer       : {fast * 1e6:8.1f} us  ({slow / fast:.1f}x faster)")
+    print(f"  memoized (cache hit): {cached * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
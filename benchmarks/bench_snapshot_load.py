@@ -0,0 +1,69 @@
+"""
+Benchmark: cold snapshot load of a support tickets file and its size on
+disk, for each way a file can be loaded: the pretty-printed JSON uploads
+used to write (json.dumps(..., indent=2), validated on load), the
+one-record-per-line JSON ingest writes now (validated, then trusted),
+and the binary snapshot file ingest writes next to it.
+
+Run from the project root:
+    python -m benchmarks.bench_snapshot_load
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from app.connectors import base
+from app.connectors.snapshot_file import snapshot_file_path
+from app.connectors.support_connector import SupportConnector
+from app.models.support import SupportTicket
+from app.services.ingest import write_json_records
+from app.utils.mock_data import generate_support_tickets
+
+
+def cold_load(connector: SupportConnector, path: Path, repeat: int = 5) -> float:
+    """Best of repeat loads with the snapshot cache cleared each time."""
+    best = float("inf")
+    for _ in range(repeat):
+        base.invalidate_snapshot()
+        start = time.perf_counter()
+        connector.load_snapshot(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(count: int = 100_000) -> None:
+    tickets = [SupportTicket.model_validate(t) for t in generate_support_tickets(count)]
+    connector = SupportConnector()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "support_tickets.json"
+        write_json_records(path, tickets)
+        snapshot_path = snapshot_file_path(path)
+        json_size, binary_size = path.stat().st_size, snapshot_path.stat().st_size
+        assert connector.load_snapshot(path).records == tickets
+
+        pretty_path = Path(tmp) / "pretty" / "support_tickets.json"
+        pretty_path.parent.mkdir()
+        pretty_path.write_text(json.dumps([t.model_dump(mode="json") for t in tickets], indent=2))
+        pretty_size = pretty_path.stat().st_size
+        pretty_time = cold_load(connector, pretty_path)
+
+        binary_time = cold_load(connector, path)
+        snapshot_path.unlink()
+        trusted_time = cold_load(connector, path)
+        base._trust_marker(path).unlink()
+        validated_time = cold_load(connector, path)
+
+    print(f"{count} support tickets, cold load (including indexes)")
+    print(f"  indent=2 JSON   : {pretty_size / 1e6:6.1f} MB  {pretty_time * 1e3:8.1f} ms")
+    print(f"  JSON, validated : {json_size / 1e6:6.1f} MB  {validated_time * 1e3:8.1f} ms")
+    print(f"  JSON, trusted   : {json_size / 1e6:6.1f} MB  {trusted_time * 1e3:8.1f} ms")
+    print(
+        f"  binary snapshot : {binary_size / 1e6:6.1f} MB  {binary_time * 1e3:8.1f} ms  "
+        f"({1 - binary_size / pretty_size:.0%} smaller, {pretty_time / binary_time:.1f}x faster than indent=2 JSON)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Tests for admission control and load shedding."""
+
+import threading
+import time
+
+import pytest
+
+from app.services.admission import AdmissionController, OverloadedError
+
+
+class TestAdmissionController:
+    def test_queue_limit_sheds(self):
+        """Test requests beyond the queue depth are rejected immediately."""
+        controller = AdmissionController(concurrency=4, max_queue=1, wait_seconds=0)
+        with controller.slot("crm"):
+            with pytest.raises(OverloadedError) as excinfo:
+                with controller.slot("support"):
+                    pass
+        assert excinfo.value.retry_after == 1
+        assert controller.stats()["shed"] == 1
+        assert controller.stats()["admitted"] == 0
+
+    def test_source_cap_times_out(self):
+        """Test a source at capacity sheds after the wait budget."""
+        controller = AdmissionController(concurrency=1, max_queue=10, wait_seconds=0.05)
+        with controller.slot("crm"):
+            with pytest.raises(OverloadedError):
+                with controller.slot("crm"):
+                    pass
+            # Other sources are unaffected
+            with controller.slot("support"):
+                pass
+
+    def test_voice_uses_reserved_slots(self):
+        """Test voice requests get capacity bulk requests cannot use."""
+        controller = AdmissionController(concurrency=2, max_queue=10, voice_reserved=1, wait_seconds=0.05)
+        with controller.slot("crm"):
+            with pytest.raises(OverloadedError):
+                with controller.slot("crm"):
+                    pass
+            with controller.slot("crm", voice=True):
+                assert controller.stats()["active"] == {"crm": 2}
+
+    def test_waiter_admitted_when_slot_frees(self):
+        """Test a waiting request proceeds once a running one finishes."""
+        controller = AdmissionController(concurrency=1, max_queue=10, wait_seconds=2)
+        started = threading.Event()
+
+        def hold():
+            with controller.slot("crm"):
+                started.set()
+                time.sleep(0.05)
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        started.wait()
+        with controller.slot("crm"):
+            pass
+        worker.join()
+        assert controller.stats()["shed"] == 0
+
+    def test_source_limit_override(self):
+        """Test per-source limits override the default cap."""
+        controller = AdmissionController(concurrency=8, max_queue=10, source_limits={"analytics": 1})
+        assert controller.limit("analytics") == 1
+        assert controller.limit("crm") == 8
+
+    def test_disabled(self):
+        """Test concurrency=0 admits everything."""
+        controller = AdmissionController(concurrency=0, max_queue=0)
+        with controller.slot("crm"):
+            with controller.slot("crm"):
+                pass
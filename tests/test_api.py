@@ -1,5 +1,9 @@
 """Tests for API endpoints."""
 
+import asyncio
+import base64
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -72,6 +76,131 @@ class TestDataEndpoint:
             assert data1["data"][0] != data2["data"][0]
 
 
+    def test_cursor_pagination(self):
+        """Test next_cursor is returned and accepted."""
+        first = client.get("/data/support?limit=2").json()
+        cursor = first["metadata"]["next_cursor"]
+        assert cursor
+        response = client.get(f"/data/support?limit=2&cursor={cursor}")
+        assert response.status_code == 200
+        assert response.json()["data"][0] != first["data"][0]
+
+    def test_invalid_cursor(self):
+        """Test handling of a malformed cursor."""
+        response = client.get("/data/crm?cursor=bogus")
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize(
+        "path, payload",
+        [
+            ("/data/support", ["t", "2025-01-01T00:00:00+00:00", 1, "SupportTicket"]),  # aware vs naive data
+            ("/data/join/tickets", ["t", "2025-01-01T00:00:00+00:00", 1, "SupportTicketWithCustomer"]),
+            ("/data/support", ["t", "2025-01-01T00:00:00", [1], "SupportTicket"]),  # unhashable id
+            ("/data/join/tickets", ["t", "2025-01-01T00:00:00", 1, "CRMCustomer"]),
+            ("/data/analytics", ["t", "2025-01-01T00:00:00", 1, "CRMCustomer"]),
+        ],
+    )
+    def test_cursor_for_other_data_rejected(self, path, payload):
+        """Test well-formed cursors that do not fit the source are a 400, not a 500."""
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        response = client.get(f"{path}?limit=2&cursor={cursor}")
+        assert response.status_code == 400
+
+    def test_cursor_from_other_source_rejected(self):
+        """Test a CRM page's cursor is refused by the analytics source."""
+        cursor = client.get("/data/crm?limit=2").json()["metadata"]["next_cursor"]
+        assert client.get(f"/data/analytics?cursor={cursor}").status_code == 400
+
+    def test_join_and_support_cursors_not_interchangeable(self):
+        """Test join cursors page the join only, and support cursors the support source only."""
+        first = client.get("/data/join/tickets?limit=2").json()
+        join_cursor = first["metadata"]["next_cursor"]
+        support_cursor = client.get("/data/support?limit=2").json()["metadata"]["next_cursor"]
+        second = client.get(f"/data/join/tickets?limit=2&cursor={join_cursor}")
+        assert second.status_code == 200
+        assert second.json()["data"][0] != first["data"][0]
+        assert client.get(f"/data/support?cursor={join_cursor}").status_code == 400
+        assert client.get(f"/data/join/tickets?cursor={support_cursor}").status_code == 400
+
+    def test_joined_tickets(self):
+        """Test the tickets-with-customers join endpoint."""
+        response = client.get("/data/join/tickets?priority=high&customer_status=active&limit=5")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["metadata"]["source"] == "support+crm"
+        for row in data["data"]:
+            assert row["priority"] == "high"
+            assert row["customer"]["status"] == "active"
+
+    def test_etag_not_modified(self):
+        """Test If-None-Match with the current ETag returns 304."""
+        first = client.get("/data/support?status=open&limit=5")
+        etag = first.headers["etag"]
+        # Weak: the body's data_freshness timestamp is not covered by the tag
+        assert etag.startswith('W/"')
+        second = client.get("/data/support?status=open&limit=5", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+
+    def test_etag_depends_on_query(self):
+        """Test different queries get different ETags."""
+        a = client.get("/data/support?status=open&limit=5").headers["etag"]
+        b = client.get("/data/support?status=closed&limit=5").headers["etag"]
+        assert a != b
+        response = client.get("/data/support?status=closed&limit=5", headers={"If-None-Match": a})
+        assert response.status_code == 200
+
+    def test_fields_projection(self):
+        """Test the fields parameter trims each record."""
+        response = client.get("/data/crm?fields=name,status&limit=3")
+        assert response.status_code == 200
+        assert all(set(row) == {"name", "status"} for row in response.json()["data"])
+        assert client.get("/data/crm?fields=bogus").status_code == 400
+
+    def test_columnar_format(self):
+        """Test format=columnar returns column names once plus value rows."""
+        records = client.get("/data/support?limit=5").json()["data"]
+        response = client.get("/data/support?limit=5&format=columnar")
+        assert response.status_code == 200
+        body = response.json()
+        assert [dict(zip(body["columns"], row)) for row in body["rows"]] == records
+        assert response.headers["etag"] != client.get("/data/support?limit=5").headers["etag"]
+        assert client.get("/data/support?format=xml").status_code == 422
+
+    def test_overload_returns_503(self, monkeypatch):
+        """Test shed fetches get a fast 503 with Retry-After."""
+        from app.services import data_service
+        from app.services.admission import AdmissionController
+        from app.services.response_cache import response_cache
+
+        monkeypatch.setattr(response_cache, "max_entries", 0)
+        monkeypatch.setattr(
+            data_service, "admission", AdmissionController(concurrency=1, max_queue=1, voice_reserved=1)
+        )
+        response = client.get("/data/crm?limit=5")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        # Voice requests still get the reserved capacity
+        assert client.get("/data/crm?voice=true").status_code == 200
+
+    def test_stream_ndjson(self):
+        """Test the export streams every matching record, newest first."""
+        response = client.get("/data/support/stream?status=open")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        total = client.get("/data/support?status=open&limit=1").json()["metadata"]["total_results"]
+        assert len(rows) == total
+        assert all(row["status"] == "open" for row in rows)
+        created = [row["created_at"] for row in rows]
+        assert created == sorted(created, reverse=True)
+
+    def test_stream_unknown_source(self):
+        """Test streaming an unknown source is a 404."""
+        response = client.get("/data/unknown/stream")
+        assert response.status_code == 404
+
+
 class TestLLMEndpoints:
     def test_get_tools_openai(self):
         """Test getting OpenAI tool definitions."""
@@ -79,7 +208,7 @@ class TestLLMEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert "tools" in data
-        assert len(data["tools"]) == 3
+        assert len(data["tools"]) == 4
         assert data["tools"][0]["type"] == "function"
 
     def test_get_tools_anthropic(self):
@@ -88,9 +217,17 @@ class TestLLMEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert "tools" in data
-        assert len(data["tools"]) == 3
+        assert len(data["tools"]) == 4
         assert "name" in data["tools"][0]
 
+    def test_get_tools_etag(self):
+        """Test tool schemas revalidate with a 304."""
+        etag = client.get("/llm/tools?provider=openai").headers["etag"]
+        response = client.get("/llm/tools?provider=openai", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        other = client.get("/llm/tools?provider=anthropic", headers={"If-None-Match": etag})
+        assert other.status_code == 200
+
     def test_get_tools_invalid_provider(self):
         """Test handling of invalid provider."""
         response = client.get("/llm/tools?provider=invalid")
@@ -108,6 +245,86 @@ class TestLLMEndpoints:
         assert "metadata" in data
         assert data["metadata"]["source"] == "crm"
 
+    def test_execute_tool_call_customer_id(self):
+        """Test customer_id tool argument is honored."""
+        response = client.post(
+            "/llm/query",
+            json={"tool": "get_crm_data", "arguments": {"customer_id": "1"}},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["metadata"]["total_results"] == 1
+        assert data["data"][0]["customer_id"] == 1
+
+    def test_execute_tool_call_fields(self):
+        """Test tool calls accept a fields projection."""
+        response = client.post(
+            "/llm/query",
+            json={"tool": "get_support_tickets", "arguments": {"limit": 3, "fields": ["ticket_id", "status"]}},
+        )
+        assert response.status_code == 200
+        assert all(set(row) == {"ticket_id", "status"} for row in response.json()["data"])
+
+    def test_execute_tool_call_columnar(self):
+        """Test tool calls can return the columnar format."""
+        response = client.post(
+            "/llm/query?format=columnar",
+            json={"tool": "get_analytics", "arguments": {"limit": 3}},
+        )
+        assert response.status_code == 200
+        assert response.json()["columns"]
+
+    def test_execute_join_tool_call(self):
+        """Test the joined tickets/customers tool."""
+        response = client.post(
+            "/llm/query",
+            json={"tool": "get_customer_tickets", "arguments": {"status": "open", "voice": True}},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["metadata"]["data_type"] == "joined_support_crm"
+        assert all("customer" in row for row in data["data"])
+
+    def test_batch_tool_calls(self):
+        """Test several tool calls in one request, in order, with per-call errors."""
+        response = client.post(
+            "/llm/query/batch",
+            json={
+                "calls": [
+                    {"tool": "get_support_tickets", "arguments": {"status": "open", "limit": 3}},
+                    {"tool": "unknown_tool", "arguments": {}},
+                    {"tool": "get_crm_data", "arguments": {"customer_id": 1}},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["tool"] for r in results] == ["get_support_tickets", "unknown_tool", "get_crm_data"]
+        assert results[0]["result"]["metadata"]["source"] == "support"
+        assert results[1]["result"] is None and "Unknown tool" in results[1]["error"]
+        assert results[2]["result"]["data"][0]["customer_id"] == 1
+
+    def test_batch_pins_snapshots_off_event_loop(self, monkeypatch):
+        """Test pinning, which may load every source's file, runs on the executor."""
+        from app.services import data_service
+
+        real_pin = data_service.pin_connectors
+
+        def pin_connectors():
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            return real_pin()
+
+        monkeypatch.setattr(data_service, "pin_connectors", pin_connectors)
+        response = client.post("/llm/query/batch", json={"calls": [{"tool": "get_crm_data", "arguments": {}}]})
+        assert response.status_code == 200
+        assert response.json()["results"][0]["error"] is None
+
+    def test_batch_requires_calls(self):
+        """Test an empty batch is rejected."""
+        response = client.post("/llm/query/batch", json={"calls": []})
+        assert response.status_code == 422
+
     def test_execute_tool_call_unknown_tool(self):
         """Test handling of unknown tool."""
         response = client.post(
@@ -115,3 +332,142 @@ class TestLLMEndpoints:
             json={"tool": "unknown_tool", "arguments": {}},
         )
         assert response.status_code == 400
+
+    def test_execute_tool_call_non_string_fields(self):
+        """Test a tool call with a scalar fields argument is a 400, not a 500."""
+        response = client.post("/llm/query", json={"tool": "get_crm_data", "arguments": {"fields": 5}})
+        assert response.status_code == 400
+
+
+class TestUploadEndpoint:
+    @pytest.fixture
+    def data_dir(self, tmp_path, monkeypatch):
+        from app.routers import upload
+
+        monkeypatch.setattr(upload, "DATA_DIR", tmp_path / "data")
+        monkeypatch.chdir(tmp_path)
+        return tmp_path / "data"
+
+    def test_upload_csv_validates_rows(self, data_dir):
+        """Test CSV uploads are validated, with bad rows skipped and reported."""
+        csv_body = (
+            "customer_id,name,email,created_at,status\n"
+            "1,Ada,ada@example.com,2025-01-01T00:00:00,active\n"
+            "2,Bob,bob@example.com,not-a-date,active\n"
+        )
+        response = client.post("/upload/crm", files={"file": ("customers.csv", csv_body, "text/csv")})
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["records"], body["rejected"]) == (1, 1)
+        assert json.loads((data_dir / "customers.json").read_text())[0]["customer_id"] == 1
+        assert client.get("/data/crm").json()["metadata"]["total_results"] == 1
+
+    def test_upload_without_valid_rows_keeps_data(self, data_dir):
+        """Test an upload with no valid rows is rejected and leaves storage alone."""
+        response = client.post("/upload/crm", files={"file": ("c.json", '[{"customer_id": "x"}]', "application/json")})
+        assert response.status_code == 400
+        assert not (data_dir / "customers.json").exists()
+
+    def test_upload_upsert(self, data_dir):
+        """Test upsert merges by key and reports what changed."""
+        base = [
+            {"metric": "dau", "date": f"2025-01-0{d}", "value": d} for d in range(1, 4)
+        ]
+        client.post("/upload/analytics", files={"file": ("a.json", json.dumps(base), "application/json")})
+        update = [base[0], {**base[1], "value": 20}, {"metric": "dau", "date": "2025-01-09", "value": 9}]
+        response = client.post(
+            "/upload/analytics?mode=upsert", files={"file": ("a.json", json.dumps(update), "application/json")}
+        )
+        body = response.json()
+        assert (body["inserted"], body["updated"], body["unchanged"]) == (1, 1, 1)
+        rows = client.get("/data/analytics?limit=10").json()["data"]
+        assert [(r["date"], r["value"]) for r in rows] == [
+            ("2025-01-09", 9), ("2025-01-03", 3), ("2025-01-02", 20), ("2025-01-01", 1),
+        ]
+
+        response = client.post(
+            "/upload/analytics?mode=append", files={"file": ("a.json", json.dumps(base), "application/json")}
+        )
+        assert (response.json()["inserted"], response.json()["unchanged"]) == (0, 3)
+
+    def test_upload_upsert_unique_indexed_value(self, data_dir):
+        """Test upserting a record whose indexed value (customer_id) no other record shares."""
+        base = [
+            {
+                "customer_id": i, "name": f"Customer {i}", "email": f"c{i}@example.com",
+                "created_at": "2025-01-01T00:00:00", "status": "active",
+            }
+            for i in range(1, 21)
+        ]
+        client.post("/upload/crm", files={"file": ("c.json", json.dumps(base), "application/json")})
+        assert client.get("/data/crm?customer_id=5").json()["data"][0]["name"] == "Customer 5"
+        update = [{**base[4], "name": "Renamed"}]
+        response = client.post(
+            "/upload/crm?mode=upsert", files={"file": ("c.json", json.dumps(update), "application/json")}
+        )
+        assert response.status_code == 200
+        assert response.json()["updated"] == 1
+        assert client.get("/data/crm?customer_id=5").json()["data"][0]["name"] == "Renamed"
+
+    def test_failed_merge_leaves_file_alone(self, data_dir, monkeypatch):
+        """Test a merge that fails while patching indexes has not rewritten the file."""
+        from app.connectors.indexes import SnapshotIndex
+
+        base = [{"metric": "dau", "date": f"2025-01-{d:02d}", "value": d} for d in range(1, 21)]
+        client.post("/upload/analytics", files={"file": ("a.json", json.dumps(base), "application/json")})
+        client.get("/data/analytics")
+        before = (data_dir / "analytics.json").read_bytes()
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("patch failed")
+
+        monkeypatch.setattr(SnapshotIndex, "patched", fail)
+        update = [{**base[0], "value": 100}]
+        with pytest.raises(RuntimeError):
+            client.post(
+                "/upload/analytics?mode=upsert", files={"file": ("a.json", json.dumps(update), "application/json")}
+            )
+        assert (data_dir / "analytics.json").read_bytes() == before
+
+    def test_large_upload_runs_as_job(self, data_dir, monkeypatch):
+        """Test uploads over the threshold return 202 and finish in the background."""
+        import time
+
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "UPLOAD_JOB_THRESHOLD_BYTES", 10)
+        rows = [{"metric": "dau", "date": f"2025-01-{d:02d}", "value": d} for d in range(1, 29)]
+        rows.append({"metric": "dau", "date": "bad", "value": 0})
+        ndjson = "\n".join(json.dumps(r) for r in rows)
+        response = client.post("/upload/analytics", files={"file": ("a.ndjson", ndjson, "application/x-ndjson")})
+        assert response.status_code == 202
+        status_url = response.json()["status_url"]
+
+        for _ in range(200):
+            job = client.get(status_url).json()
+            if job["status"] in ("succeeded", "failed"):
+                break
+            time.sleep(0.01)
+        assert job["status"] == "succeeded"
+        assert (job["rows_parsed"], job["rows_rejected"]) == (29, 1)
+        assert job["result"]["records"] == 28
+        assert client.get("/data/analytics?limit=1").json()["metadata"]["total_results"] == 28
+
+    def test_unknown_job(self):
+        """Test polling an unknown job id is a 404."""
+        assert client.get("/upload/jobs/nope").status_code == 404
+
+    def test_upload_malformed_json(self, data_dir):
+        """Test malformed JSON is a 400."""
+        response = client.post("/upload/crm", files={"file": ("c.json", "[{", "application/json")})
+        assert response.status_code == 400
+
+
+class TestNaturalQueryEndpoint:
+    def test_ticket_question(self):
+        """Test a spoken ticket question is routed to the support tool."""
+        response = client.post("/query/", json={"query": "show me support tickets"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["tool_used"] == "get_support_tickets"
+        assert data["results"] == len(data["data"]["data"])
@@ -8,9 +8,12 @@ from app.models.analytics import AnalyticsPoint
 from app.models.crm import CRMCustomer
 from app.models.support import SupportTicket
 from app.services.business_rules import (
+    InvalidFieldsError,
     apply_filters,
     apply_pagination,
+    apply_projection,
     apply_voice_limits,
+    parse_fields,
     prioritize_recent,
 )
 
@@ -93,6 +96,21 @@ class TestPrioritizeRecent:
         """Test handling of empty list."""
         assert prioritize_recent([]) == []
 
+    def test_top_k_matches_full_sort(self):
+        """Test top-k selection keeps newest-first order and tie-breaking."""
+        points = [
+            AnalyticsPoint(metric=f"m{i}", date=date(2025, 1, (i % 5) + 1), value=i)
+            for i in range(40)
+        ]
+        expected = prioritize_recent(points)[:7]
+        result = prioritize_recent(points, top_k=7)
+        assert [p.metric for p in result] == [p.metric for p in expected]
+
+    def test_top_k_larger_than_data(self, sample_customers):
+        """Test top_k beyond the list length returns everything sorted."""
+        result = prioritize_recent(sample_customers, top_k=10)
+        assert [c.customer_id for c in result] == [3, 2, 1]
+
 
 class TestApplyFilters:
     def test_filter_crm_by_status(self, sample_customers):
@@ -149,3 +167,20 @@ class TestApplyPagination:
         """Test pagination when limit exceeds available data."""
         result = apply_pagination(sample_customers, offset=0, limit=10)
         assert len(result) == 3
+
+
+class TestApplyProjection:
+    def test_projection_keeps_requested_fields(self, sample_customers):
+        """Test projecting models down to selected fields."""
+        result = apply_projection(sample_customers, ["name", "status"])
+        assert result[0] == {"name": "Customer 1", "status": "active"}
+
+    def test_parse_fields(self):
+        """Test comma-separated and list projections normalize the same way."""
+        assert parse_fields("name, status,name") == ("name", "status")
+        assert parse_fields(["name", "status"]) == ("name", "status")
+        assert parse_fields("") is None
+        assert parse_fields(None) is None
+        for bad in (5, ["name", 5], {"name": True}):
+            with pytest.raises(InvalidFieldsError):
+                parse_fields(bad)
@@ -6,13 +6,17 @@ from datetime import date, datetime
 from pathlib import Path
 
 import pytest
+from pydantic import ValidationError
 
 from app.connectors.analytics_connector import AnalyticsConnector
+from app.connectors.base import invalidate_snapshot
 from app.connectors.crm_connector import CRMConnector
+from app.connectors.snapshot_file import snapshot_file_path
 from app.connectors.support_connector import SupportConnector
 from app.models.analytics import AnalyticsPoint
 from app.models.crm import CRMCustomer
 from app.models.support import SupportTicket
+from app.services.ingest import write_json_records
 
 
 @pytest.fixture
@@ -121,3 +125,161 @@ class TestAnalyticsConnector:
         assert result[0].metric == "daily_active_users"
         assert result[0].value == 100
         assert result[0].date == date(2025, 1, 1)
+
+
+class TestSnapshotCache:
+    def test_repeated_fetch_skips_disk_read(self, temp_data_dir, monkeypatch):
+        """Test that an unchanged file is served from the snapshot cache."""
+        monkeypatch.chdir(temp_data_dir.parent)
+        connector = CRMConnector()
+        first = connector.fetch()
+
+        def fail_read(*args, **kwargs):
+            raise AssertionError("file should not be re-read")
+
+        monkeypatch.setattr(Path, "read_text", fail_read)
+        second = connector.fetch()
+        assert second == first
+
+    def test_rewrite_invalidates_cache(self, temp_data_dir, monkeypatch):
+        """Test that rewriting the file is picked up on the next fetch."""
+        monkeypatch.chdir(temp_data_dir.parent)
+        connector = SupportConnector()
+        assert len(connector.fetch()) == 1
+
+        tickets = json.loads((temp_data_dir / "support_tickets.json").read_text())
+        tickets.append({**tickets[0], "ticket_id": 2, "status": "closed"})
+        (temp_data_dir / "support_tickets.json").write_text(json.dumps(tickets))
+
+        result = connector.fetch()
+        assert [t.ticket_id for t in result] == [1, 2]
+
+
+    def test_trusted_file_skips_validation(self, temp_data_dir, monkeypatch):
+        """Test files written by ingest load without re-validation, and hand edits void the mark."""
+        monkeypatch.chdir(temp_data_dir.parent)
+        connector = AnalyticsConnector()
+        path = temp_data_dir / "analytics.json"
+        expected = connector.fetch()
+        write_json_records(path, expected)
+        snapshot_file_path(path).unlink()  # exercise the trusted JSON path
+
+        def fail_validate(*args, **kwargs):
+            raise AssertionError("trusted file should not be re-validated")
+
+        with monkeypatch.context() as m:
+            m.setattr(AnalyticsPoint, "model_validate", fail_validate)
+            loaded = connector.fetch()
+        assert loaded == expected
+        assert isinstance(loaded[0].date, date)
+
+        path.write_text(json.dumps([{"metric": "x", "date": "not a date", "value": 1}]))
+        with pytest.raises(ValidationError):
+            connector.fetch()
+
+
+    def test_schema_change_voids_trust(self, temp_data_dir, monkeypatch):
+        """Test a trusted file is re-validated once the model's fields change."""
+        monkeypatch.chdir(temp_data_dir.parent)
+        connector = AnalyticsConnector()
+        path = temp_data_dir / "analytics.json"
+        write_json_records(path, connector.fetch())
+        snapshot_file_path(path).unlink()
+        invalidate_snapshot()
+
+        class ChangedPoint(AnalyticsPoint):
+            unit: str  # a required field added by a later deploy
+
+        connector.model = ChangedPoint
+        with pytest.raises(ValidationError):
+            connector.fetch()
+
+
+class TestIndexedQuery:
+    @pytest.fixture
+    def many_tickets(self, tmp_path, monkeypatch):
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        tickets = [
+            {
+                "ticket_id": i,
+                "customer_id": i % 5,
+                "subject": f"Issue {i}",
+                "priority": ["low", "medium", "high"][i % 3],
+                "created_at": f"2025-01-{(i % 9) + 1:02d}T00:00:00",
+                "status": "open" if i % 2 == 0 else "closed",
+            }
+            for i in range(1, 61)
+        ]
+        (data_dir / "support_tickets.json").write_text(json.dumps(tickets))
+        monkeypatch.chdir(tmp_path)
+
+    @pytest.mark.parametrize(
+        "filters",
+        [{}, {"status": "open"}, {"status": "open", "priority": "high"}, {"metric": "ignored"}],
+    )
+    def test_matches_fallback_path(self, many_tickets, filters):
+        """Test index-backed queries agree with the Python fallback."""
+        from app.connectors.base import BaseConnector, QuerySpec
+
+        connector = SupportConnector()
+        spec = QuerySpec.build(offset=2, limit=7, **filters)
+        indexed = connector.query(spec)
+        fallback = BaseConnector.query(connector, spec)
+        assert indexed.total == fallback.total
+        assert indexed.records == fallback.records
+
+    def test_stream_matches_fallback(self, many_tickets):
+        """Test streaming a snapshot yields the fallback's full ordered result."""
+        from app.connectors.base import BaseConnector, QuerySpec
+
+        connector = SupportConnector()
+        spec = QuerySpec.build(status="open", fields=("ticket_id",))
+        assert list(connector.stream(spec)) == BaseConnector.query(connector, spec).records
+
+    def test_patched_index_matches_rebuild(self, many_tickets):
+        """Test patching an index for updates and appends equals a fresh build."""
+        from app.connectors.indexes import SnapshotIndex
+        from app.models.support import SupportTicket
+
+        connector = SupportConnector()
+        snapshot = connector.load_snapshot(connector.path)
+        records = list(snapshot.records)
+        records[4] = records[4].model_copy(update={"status": "closed", "created_at": datetime(2025, 1, 5)})
+        records.append(
+            SupportTicket(
+                ticket_id=99, customer_id=1, subject="New", priority="high",
+                created_at=datetime(2025, 1, 3), status="open",
+            )
+        )
+        patched = snapshot.index.patched(snapshot.records, records, [4, len(records) - 1])
+        rebuilt = SnapshotIndex(records, connector.index_fields)
+        assert patched.recency_order == rebuilt.recency_order
+        assert patched.rank == rebuilt.rank
+        assert patched.postings == rebuilt.postings
+        # The original index is untouched for readers still holding it
+        assert snapshot.index.size == len(snapshot.records)
+
+    def test_combined_filter_count(self, many_tickets):
+        """Test intersecting posting lists for combined filters."""
+        connector = SupportConnector()
+        index = connector.load_snapshot(connector.path).index
+        filters = (("priority", "high"), ("status", "open"))
+        expected = [
+            t for t in connector.fetch() if t.status == "open" and t.priority == "high"
+        ]
+        assert index.count(filters) == len(expected)
+        assert index.match(filters) == sorted(index.match(filters))
+
+    def test_memo_is_bounded(self, many_tickets, monkeypatch):
+        """Test one-off lookups (a customer_id each) cannot grow the memo past its bound."""
+        from app.connectors import indexes
+
+        monkeypatch.setattr(indexes, "MEMO_ENTRIES", 3)
+        connector = SupportConnector()
+        index = indexes.SnapshotIndex(connector.fetch(), connector.index_fields)
+        for customer_id in range(10):
+            index.ordered((("customer_id", customer_id),))
+        assert len(index._matches) == len(index._ordered) == 3
+        members = set(index.postings["customer_id"][1])
+        assert index.ordered((("customer_id", 1),)) == [p for p in index.recency_order if p in members]
@@ -1,5 +1,6 @@
 """Tests for data service."""
 
+import asyncio
 import json
 from datetime import date, datetime
 from pathlib import Path
@@ -135,3 +136,354 @@ class TestFetchData:
         
         if len(result1.data) > 0 and len(result2.data) > 0:
             assert result1.data[0].customer_id != result2.data[0].customer_id
+
+
+class TestQueryPushdown:
+    def test_fallback_query_matches_business_rules(self, temp_data_dir):
+        """Test the default BaseConnector.query filters, sorts and paginates."""
+        from app.connectors.base import QuerySpec
+        from app.services.data_service import CONNECTOR_MAP
+
+        spec = QuerySpec.build(status="active", offset=1, limit=2)
+        result = CONNECTOR_MAP["crm"].query(spec)
+        assert result.total == 5
+        assert result.data_type == "tabular_crm"
+        assert [c.customer_id for c in result.records] == [8, 6]
+
+    def test_fetch_data_uses_connector_query(self, temp_data_dir, monkeypatch):
+        """Test that fetch_data hands filters and paging to the connector."""
+        from app.connectors.base import BaseConnector, QueryResult
+        from app.services import data_service
+
+        seen = []
+
+        class PushdownConnector(BaseConnector):
+            def fetch(self, **kwargs):
+                raise AssertionError("fetch should not be called")
+
+            def query(self, spec):
+                seen.append(spec)
+                return QueryResult([{"customer_id": 1}], 42, "tabular_crm")
+
+        monkeypatch.setitem(data_service.CONNECTOR_MAP, "crm", PushdownConnector())
+        result = fetch_data("crm", status="active", limit=5, offset=10)
+        assert result.metadata.total_results == 42
+        assert result.metadata.returned_results == 1
+        assert seen[0].filter_kwargs() == {"status": "active"}
+        assert (seen[0].offset, seen[0].limit) == (10, 5)
+
+
+class TestCursorPagination:
+    def test_cursor_walk_matches_offset_pages(self, temp_data_dir):
+        """Test following next_cursor visits the same items as offset paging."""
+        by_offset = [c.customer_id for c in fetch_data("crm", limit=10).data]
+
+        seen = []
+        result = fetch_data("crm", limit=3)
+        while True:
+            seen.extend(c.customer_id for c in result.data)
+            if not result.metadata.next_cursor:
+                break
+            result = fetch_data("crm", limit=3, cursor=result.metadata.next_cursor)
+        assert seen == by_offset
+
+    def test_cursor_stable_across_upload(self, temp_data_dir):
+        """Test that inserting a newer record does not shift the next page."""
+        first = fetch_data("support", limit=4)
+        expected = fetch_data("support", limit=4, offset=4)
+
+        tickets = json.loads((temp_data_dir / "support_tickets.json").read_text())
+        tickets.append({**tickets[0], "ticket_id": 99, "created_at": "2025-02-01T00:00:00"})
+        (temp_data_dir / "support_tickets.json").write_text(json.dumps(tickets))
+
+        second = fetch_data("support", limit=4, cursor=first.metadata.next_cursor)
+        assert [t.ticket_id for t in second.data] == [t.ticket_id for t in expected.data]
+
+    def test_invalid_cursor(self, temp_data_dir):
+        """Test a malformed cursor raises InvalidCursorError."""
+        from app.services.business_rules import InvalidCursorError
+
+        with pytest.raises(InvalidCursorError):
+            fetch_data("crm", cursor="not-a-cursor")
+
+
+class TestCustomerLookup:
+    def test_crm_customer_id(self, temp_data_dir):
+        """Test fetching a single customer by id."""
+        result = fetch_data("crm", customer_id=7)
+        assert result.metadata.total_results == 1
+        assert result.data[0].customer_id == 7
+
+    def test_support_tickets_for_customer(self, temp_data_dir):
+        """Test combining customer_id with ticket filters."""
+        result = fetch_data("support", customer_id=4, status="open")
+        assert result.metadata.total_results == 1
+        assert all(t.customer_id == 4 and t.status == "open" for t in result.data)
+
+    def test_unknown_customer_id(self, temp_data_dir):
+        """Test a missing customer returns no results."""
+        result = fetch_data("crm", customer_id=999)
+        assert result.metadata.total_results == 0
+        assert result.data == []
+
+
+class TestFieldProjection:
+    def test_fields_restrict_records(self, temp_data_dir):
+        """Test only the requested fields are returned."""
+        result = fetch_data("crm", fields="name,status", limit=5)
+        assert result.data
+        assert all(set(row) == {"name", "status"} for row in result.data)
+
+    def test_unknown_field_rejected(self, temp_data_dir):
+        """Test a projection naming a missing field raises."""
+        from app.services.business_rules import InvalidFieldsError
+
+        with pytest.raises(InvalidFieldsError):
+            fetch_data("crm", fields=["name", "salary"])
+
+    def test_voice_default_projection(self, temp_data_dir):
+        """Test voice mode drops fields that are rarely read aloud."""
+        result = fetch_data("crm", voice=True)
+        assert set(result.data[0]) == {"customer_id", "name", "status"}
+        explicit = fetch_data("crm", voice=True, fields=["email"])
+        assert set(explicit.data[0]) == {"email"}
+
+    def test_projection_keeps_cursor(self, temp_data_dir):
+        """Test projected pages still carry a usable next cursor."""
+        first = fetch_data("support", fields=["subject"], limit=3)
+        second = fetch_data("support", limit=3, cursor=first.metadata.next_cursor)
+        full = fetch_data("support", limit=6)
+        assert [t.ticket_id for t in second.data] == [t.ticket_id for t in full.data[3:]]
+
+
+class TestFetchJoined:
+    def test_join_filters_both_sides(self, temp_data_dir):
+        """Test joining open tickets to active customers."""
+        from app.services.data_service import fetch_joined
+
+        result = fetch_joined(status="open", customer_status="active", limit=50)
+        # Even ticket ids are open and belong to even (active) customers
+        assert result.metadata.total_results == 5
+        assert result.metadata.data_type == "joined_support_crm"
+        for row in result.data:
+            assert row.status == "open"
+            assert row.customer.customer_id == row.customer_id
+            assert row.customer.status == "active"
+
+    def test_join_voice_limits(self, temp_data_dir):
+        """Test voice mode caps rows and adds a summary."""
+        from app.services.data_service import fetch_joined
+
+        result = fetch_joined(voice=True)
+        assert result.metadata.returned_results <= 10
+        assert "tickets from" in result.metadata.voice_summary
+
+    def test_join_excludes_unmatched(self, temp_data_dir):
+        """Test inner-join semantics when customers are filtered out."""
+        from app.services.data_service import fetch_joined
+
+        result = fetch_joined(customer_status="inactive", status="open", limit=50)
+        assert result.metadata.total_results == 0
+
+
+class TestSingleFlight:
+    def test_concurrent_identical_fetches_coalesce(self, monkeypatch):
+        """Test concurrent identical calls share one computation."""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from app.connectors.base import BaseConnector, QueryResult
+        from app.services import data_service
+        from app.services.response_cache import response_cache
+
+        release = threading.Event()
+        calls = []
+
+        class SlowConnector(BaseConnector):
+            def fetch(self, **kwargs):
+                return []
+
+            def version(self):
+                return "v1"
+
+            def query(self, spec):
+                calls.append(spec)
+                release.wait(timeout=5)
+                return QueryResult([{"customer_id": 1}], 1, "tabular_crm")
+
+        monkeypatch.setitem(data_service.CONNECTOR_MAP, "crm", SlowConnector())
+        monkeypatch.setattr(response_cache, "max_entries", 0)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(fetch_data, "crm", status="active") for _ in range(8)]
+            while not calls:
+                time.sleep(0.001)
+            threading.Timer(0.2, release.set).start()
+            results = [f.result() for f in futures]
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+
+    def test_errors_propagate_to_waiters(self):
+        """Test an exception from the leader reaches every caller."""
+        from app.services.data_service import SingleFlight
+
+        def fail():
+            raise RuntimeError("boom")
+
+        flight = SingleFlight()
+        with pytest.raises(RuntimeError):
+            flight.do("key", fail)
+        assert flight.do("key", lambda: 42) == 42
+
+
+class TestAsyncFetch:
+    @pytest.mark.asyncio
+    async def test_afetch_data_matches_fetch_data(self, temp_data_dir):
+        """Test the async variant returns the same page as fetch_data."""
+        from app.services.data_service import afetch_data
+
+        result = await afetch_data("support", status="open", limit=3)
+        assert result.data == fetch_data("support", status="open", limit=3).data
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_leaves_followers_waiting(self, temp_data_dir, monkeypatch):
+        """Test cancelling one of two coalesced callers does not cancel the other."""
+        import threading
+
+        from app.services import data_service
+
+        release = threading.Event()
+        real_query_source = data_service._query_source
+
+        def slow_query_source(*args):
+            release.wait(5)
+            return real_query_source(*args)
+
+        monkeypatch.setattr(data_service, "_query_source", slow_query_source)
+        leader = asyncio.create_task(data_service.afetch_data("support", status="closed", limit=4))
+        follower = asyncio.create_task(data_service.afetch_data("support", status="closed", limit=4))
+        await asyncio.sleep(0.1)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        result = await follower
+        assert len(result.data) == 4
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    @pytest.mark.asyncio
+    async def test_connector_aquery(self, temp_data_dir):
+        """Test the async connector interface runs queries off the event loop."""
+        from app.connectors.base import QuerySpec
+        from app.connectors.crm_connector import CRMConnector
+
+        connector = CRMConnector()
+        assert len(await connector.afetch()) == 10
+        result = await connector.aquery(QuerySpec.build(status="active", limit=2))
+        assert result.total == 5
+
+    @pytest.mark.asyncio
+    async def test_afetch_data_plans_off_event_loop(self, temp_data_dir, monkeypatch):
+        """Test the version lookup, which may load a file or query SQLite, runs on the executor."""
+        from app.connectors.support_connector import SupportConnector
+        from app.services.data_service import afetch_data
+
+        connector = SupportConnector()
+        real_version = connector.version
+        calls = []
+
+        def version():
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            calls.append(1)
+            return real_version()
+
+        monkeypatch.setattr(connector, "version", version)
+        await afetch_data("support", connectors={"support": connector}, limit=3)
+        assert calls
+
+    def test_submit_followers_share_one_worker(self):
+        """Test followers of an in-flight submit get its future without a new task."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        from app.services.data_service import SingleFlight
+
+        release = threading.Event()
+        runs = []
+
+        def slow():
+            runs.append(1)
+            release.wait(timeout=5)
+            return "done"
+
+        flight = SingleFlight()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            futures = [flight.submit("key", slow, pool) for _ in range(5)]
+            release.set()
+            assert all(f is futures[0] for f in futures)
+            assert futures[0].result(timeout=5) == "done"
+        assert runs == [1]
+
+
+class TestPinnedSnapshots:
+    def test_pinned_connectors_ignore_later_writes(self, temp_data_dir):
+        """Test pinned connectors keep reading the snapshot they were bound to."""
+        from app.services.data_service import pin_connectors
+
+        pinned = pin_connectors()
+        (temp_data_dir / "customers.json").write_text("[]")
+
+        assert fetch_data("crm", connectors=pinned).metadata.total_results == 10
+        assert fetch_data("crm").metadata.total_results == 0
+
+    def test_snapshot_version_increases_on_rewrite(self, temp_data_dir):
+        """Test metadata reports a new dataset version after the file changes."""
+        from app.services.data_service import pin_connectors
+
+        before = fetch_data("support").metadata.snapshot_version
+        pinned = pin_connectors()
+        (temp_data_dir / "support_tickets.json").write_text("[]")
+
+        after = fetch_data("support").metadata.snapshot_version
+        assert before is not None and after > before
+        assert fetch_data("support", connectors=pinned).metadata.snapshot_version == before
+
+    def test_snapshot_version_survives_reload(self, temp_data_dir):
+        """Test the version is persisted with the file: reloads (or restarts) keep it, writes bump it."""
+        from app.connectors.base import invalidate_snapshot
+        from app.models.support import SupportTicket
+        from app.services.ingest import write_json_records
+
+        before = fetch_data("support").metadata.snapshot_version
+        invalidate_snapshot()
+        assert fetch_data("support").metadata.snapshot_version == before
+
+        write_json_records(temp_data_dir / "support_tickets.json", [SupportTicket.model_validate({
+            "ticket_id": 1, "customer_id": 1, "subject": "Only", "priority": "low",
+            "created_at": "2025-01-01T00:00:00", "status": "open",
+        })])
+        assert fetch_data("support").metadata.snapshot_version == before + 1
+        invalidate_snapshot()
+        assert fetch_data("support").metadata.snapshot_version == before + 1
+
+
+class TestDataEtag:
+    def test_etag_changes_with_data(self, temp_data_dir):
+        """Test the ETag tracks the snapshot version and normalized query."""
+        from app.services.data_service import data_etag
+
+        etag = data_etag("crm", status="active")
+        assert etag == data_etag("crm", status="active", priority="")
+        assert etag != data_etag("crm", status="inactive")
+
+        (temp_data_dir / "customers.json").write_text("[]")
+        assert etag != data_etag("crm", status="active")
+
+    def test_unknown_source_has_no_etag(self):
+        """Test unknown sources are not conditionally cached."""
+        from app.services.data_service import data_etag
+
+        assert data_etag("unknown") is None
@@ -0,0 +1,132 @@
+"""Tests for streaming upload ingestion."""
+
+import io
+import json
+
+import pytest
+
+from app.models.support import SupportTicket
+from app.services.ingest import (
+    IngestError,
+    IngestStats,
+    iter_csv_rows,
+    iter_json_rows,
+    iter_text,
+    merge_records,
+    validate_rows,
+    write_json_records,
+)
+
+TICKETS = [
+    {
+        "ticket_id": i,
+        "customer_id": i % 3,
+        "subject": f"Issue {i} – “quoted”",
+        "priority": "high",
+        "created_at": f"2025-01-{i:02d}T00:00:00",
+        "status": "open",
+    }
+    for i in range(1, 21)
+]
+
+
+def chunked(text: str, size: int = 7):
+    """Decode through iter_text with tiny chunks to exercise every boundary."""
+    return iter_text(io.BytesIO(text.encode("utf-8")), chunk_size=size)
+
+
+class TestParsers:
+    def test_json_array_across_chunks(self):
+        """Test an indented JSON array is parsed row by row."""
+        assert list(iter_json_rows(chunked(json.dumps(TICKETS, indent=2)))) == TICKETS
+
+    def test_ndjson_and_single_object(self):
+        """Test NDJSON and a lone object are both sequences of top-level values."""
+        ndjson = "\n".join(json.dumps(t) for t in TICKETS) + "\n"
+        assert list(iter_json_rows(chunked(ndjson))) == TICKETS
+        assert list(iter_json_rows(chunked(json.dumps(TICKETS[0])))) == TICKETS[:1]
+
+    def test_csv_rows(self):
+        """Test CSV rows come back as dicts keyed by header."""
+        lines = ["ticket_id,customer_id,subject,priority,created_at,status"]
+        lines += [f'{t["ticket_id"]},{t["customer_id"]},"{t["subject"]}",high,{t["created_at"]},open' for t in TICKETS]
+        rows = list(iter_csv_rows(chunked("\n".join(lines))))
+        assert len(rows) == 20
+        assert rows[0]["subject"] == TICKETS[0]["subject"]
+
+    @pytest.mark.parametrize("text", ['[{"a": 1}, {"a": ', '[{"a": 1}] x', "[{oops}]"])
+    def test_malformed_json(self, text):
+        """Test truncated or malformed JSON raises IngestError."""
+        with pytest.raises(IngestError):
+            list(iter_json_rows(chunked(text)))
+
+    def test_non_utf8(self):
+        """Test undecodable bytes raise IngestError."""
+        with pytest.raises(IngestError):
+            list(iter_text(io.BytesIO(b"\xff\xfe\x00bad")))
+
+
+    def test_csv_field_with_unicode_line_separators(self):
+        """Test characters str.splitlines treats as breaks stay inside their field."""
+        subject = "a\u2028b\x0bc\x0cd\x1ce\x85f"
+        text = "ticket_id,subject\r\n1,%s\r\n2,\"multi\nline\"\n" % subject
+        rows = list(iter_csv_rows(chunked(text, size=3)))
+        assert rows == [{"ticket_id": "1", "subject": subject}, {"ticket_id": "2", "subject": "multi\nline"}]
+
+
+class TestValidation:
+    def test_invalid_rows_skipped_and_counted(self):
+        """Test invalid rows are reported without stopping the stream."""
+        rows = [TICKETS[0], {**TICKETS[1], "priority": "urgent"}, TICKETS[2]]
+        stats = IngestStats()
+        records = list(validate_rows(rows, SupportTicket, stats))
+        assert [r.ticket_id for r in records] == [1, 3]
+        assert (stats.accepted, stats.rejected) == (2, 1)
+        assert stats.errors[0].startswith("row 2: priority")
+
+    def test_write_json_records(self, tmp_path):
+        """Test the JSON array is written with its sidecar files, and no temp file is left."""
+        path = tmp_path / "support_tickets.json"
+        records = [SupportTicket.model_validate(t) for t in TICKETS]
+        assert write_json_records(path, iter(records)) == 20
+        assert [SupportTicket.model_validate(t) for t in json.loads(path.read_text())] == records
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            ".support_tickets.json.snap",
+            ".support_tickets.json.trusted",
+            ".support_tickets.json.version",
+            path.name,
+        ]
+
+    def test_write_json_records_keeps_file_mode(self, tmp_path):
+        """Test new files follow the umask rather than mkstemp's 0600, and rewrites keep the file's mode."""
+        from app.utils import files
+
+        path = tmp_path / "support_tickets.json"
+        records = [SupportTicket.model_validate(t) for t in TICKETS]
+        write_json_records(path, records)
+        assert path.stat().st_mode & 0o777 == 0o666 & ~files._UMASK
+        path.chmod(0o640)
+        write_json_records(path, records)
+        assert path.stat().st_mode & 0o777 == 0o640
+
+
+class TestMergeRecords:
+    def test_upsert_and_append_counts(self):
+        """Test upsert updates changed keys while append leaves them alone."""
+        existing = [SupportTicket.model_validate(t) for t in TICKETS[:3]]
+        incoming = [
+            existing[0],
+            existing[1].model_copy(update={"status": "closed"}),
+            SupportTicket.model_validate(TICKETS[5]),
+        ]
+
+        stats = IngestStats()
+        merged, changed = merge_records(existing, incoming, ("ticket_id",), stats)
+        assert (stats.inserted, stats.updated, stats.unchanged) == (1, 1, 1)
+        assert changed == [1, 3]
+        assert merged[1].status == "closed" and existing[1].status == "open"
+
+        stats = IngestStats()
+        merged, changed = merge_records(existing, incoming, ("ticket_id",), stats, update=False)
+        assert (stats.inserted, stats.updated, stats.unchanged) == (1, 0, 2)
+        assert merged[1].status == "open"
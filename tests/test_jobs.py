@@ -0,0 +1,53 @@
+"""Tests for the background ingest job queue."""
+
+import threading
+import time
+
+from app.services.jobs import JobQueue
+
+
+def wait_for(job):
+    for _ in range(500):
+        if job.finished_at is not None:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+class TestJobQueue:
+    def test_progress_visible_while_running(self):
+        """Test stats updated by the work are reported before the job finishes."""
+        queue = JobQueue(workers=1)
+        halfway = threading.Event()
+        proceed = threading.Event()
+
+        def work(stats):
+            stats.accepted = 5
+            stats.rejected = 1
+            halfway.set()
+            proceed.wait(timeout=5)
+            stats.accepted = 10
+            return {"records": 10}
+
+        job = queue.submit("crm", "replace", work)
+        halfway.wait(timeout=5)
+        progress = queue.get(job.id).progress()
+        assert (progress["status"], progress["rows_parsed"], progress["rows_rejected"]) == ("running", 6, 1)
+
+        proceed.set()
+        wait_for(job)
+        progress = job.progress()
+        assert progress["status"] == "succeeded"
+        assert progress["result"] == {"records": 10}
+        assert progress["rows_per_second"] is not None
+
+    def test_failed_job_reports_error(self):
+        """Test an exception marks the job failed with its message."""
+        queue = JobQueue(workers=1)
+
+        def work(stats):
+            raise ValueError("Invalid JSON: boom")
+
+        job = wait_for(queue.submit("crm", "replace", work))
+        assert job.status == "failed"
+        assert job.progress()["error"] == "Invalid JSON: boom"
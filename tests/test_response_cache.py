@@ -0,0 +1,94 @@
+"""Tests for the fetch_data response cache."""
+
+import json
+
+import pytest
+
+from app.services.response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache:
+    def test_hit_and_miss_counters(self):
+        """Test hits and misses are counted."""
+        cache = ResponseCache(max_entries=4, ttl_seconds=10)
+        assert cache.get(("crm", 1)) is None
+        cache.put(("crm", 1), "response")
+        assert cache.get(("crm", 1)) == "response"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = ResponseCache(max_entries=2, ttl_seconds=10)
+        cache.put(("crm", 1), "a")
+        cache.put(("crm", 2), "b")
+        cache.get(("crm", 1))
+        cache.put(("crm", 3), "c")
+        assert cache.get(("crm", 2)) is None
+        assert cache.get(("crm", 1)) == "a"
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL."""
+        clock = FakeClock()
+        cache = ResponseCache(max_entries=2, ttl_seconds=5, clock=clock)
+        cache.put(("crm", 1), "a")
+        clock.now = 4.9
+        assert cache.get(("crm", 1)) == "a"
+        clock.now = 5.0
+        assert cache.get(("crm", 1)) is None
+
+    def test_invalidate_source(self):
+        """Test invalidating one source keeps the others."""
+        cache = ResponseCache(max_entries=4, ttl_seconds=10)
+        cache.put(("crm", 1), "a")
+        cache.put(("support", 1), "b")
+        assert cache.invalidate("crm") == 1
+        assert cache.get(("crm", 1)) is None
+        assert cache.get(("support", 1)) == "b"
+
+
+class TestFetchDataCaching:
+    @pytest.fixture
+    def crm_dir(self, tmp_path, monkeypatch):
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        customers = [
+            {
+                "customer_id": i,
+                "name": f"Customer {i}",
+                "email": f"c{i}@example.com",
+                "created_at": f"2025-01-{i:02d}T00:00:00",
+                "status": "active",
+            }
+            for i in range(1, 6)
+        ]
+        (data_dir / "customers.json").write_text(json.dumps(customers))
+        monkeypatch.chdir(tmp_path)
+        return data_dir
+
+    def test_equivalent_requests_share_entry(self, crm_dir):
+        """Test normalized parameters hit the same cache entry."""
+        from app.services.data_service import fetch_data
+
+        first = fetch_data("crm", status="active")
+        # Voice ignores offset and an empty filter is no filter
+        assert fetch_data("crm", status="active", priority="") is first
+        assert fetch_data("crm", voice=True, offset=3) is fetch_data("crm", voice=True)
+
+    def test_file_change_bypasses_entry(self, crm_dir):
+        """Test a rewritten file produces a fresh response."""
+        from app.services.data_service import fetch_data
+
+        assert fetch_data("crm").metadata.total_results == 5
+        customers = json.loads((crm_dir / "customers.json").read_text())
+        (crm_dir / "customers.json").write_text(json.dumps(customers[:2]))
+        assert fetch_data("crm").metadata.total_results == 2
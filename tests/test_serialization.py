@@ -0,0 +1,66 @@
+"""Tests for the fast DataResponse serializer."""
+
+import json
+from datetime import date, datetime
+
+from app.models.analytics import AnalyticsPoint
+from app.models.common import DataResponse, Metadata
+from app.models.crm import CRMCustomer
+from app.services.serialization import render_columnar_response, render_data_response
+
+
+def _response(data):
+    return DataResponse(
+        data=data,
+        metadata=Metadata(total_results=len(data), returned_results=len(data), data_freshness="now"),
+    )
+
+
+class TestRenderDataResponse:
+    def test_matches_pydantic_json(self):
+        """Test output equals the standard pydantic JSON dump."""
+        response = _response(
+            [
+                CRMCustomer(
+                    customer_id=1,
+                    name="Zoë",
+                    email="z@example.com",
+                    created_at=datetime(2025, 1, 1, 9, 30),
+                    status="active",
+                )
+            ]
+        )
+        assert json.loads(render_data_response(response)) == response.model_dump(mode="json")
+
+    def test_mixed_records(self):
+        """Test aggregated dicts and models both serialize."""
+        response = _response(
+            [{"type": "aggregated", "count": 2}, AnalyticsPoint(metric="dau", date=date(2025, 1, 1), value=3)]
+        )
+        rendered = json.loads(render_data_response(response))
+        assert rendered["data"][1] == {"metric": "dau", "date": "2025-01-01", "value": 3}
+
+    def test_bytes_memoized(self):
+        """Test a response is only encoded once."""
+        response = _response([])
+        assert render_data_response(response) is render_data_response(response)
+
+
+class TestRenderColumnar:
+    def test_rows_match_records(self):
+        """Test columnar rows carry the same values as the JSON records."""
+        points = [
+            AnalyticsPoint(metric="dau", date=date(2025, 1, day), value=day * 10) for day in range(1, 4)
+        ]
+        response = _response(points)
+        columnar = json.loads(render_columnar_response(response))
+        records = json.loads(render_data_response(response))["data"]
+        assert columnar["columns"] == ["metric", "date", "value"]
+        assert [dict(zip(columnar["columns"], row)) for row in columnar["rows"]] == records
+        assert columnar["metadata"]["total_results"] == 3
+
+    def test_dict_rows_use_key_union(self):
+        """Test projected dicts with differing keys fill gaps with null."""
+        columnar = json.loads(render_columnar_response(_response([{"a": 1}, {"b": 2}])))
+        assert columnar["columns"] == ["a", "b"]
+        assert columnar["rows"] == [[1, None], [None, 2]]
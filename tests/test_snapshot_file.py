@@ -0,0 +1,111 @@
+"""Tests for binary columnar snapshot files."""
+
+import json
+from datetime import date, datetime, timedelta, timezone
+
+from pydantic import create_model
+
+from app.connectors import base
+from app.connectors.analytics_connector import AnalyticsConnector
+from app.connectors.base import file_key, typed_constructor
+from app.connectors.crm_connector import CRMConnector
+from app.connectors.snapshot_file import SnapshotWriter, read_snapshot_file, snapshot_file_path
+from app.connectors.support_connector import SupportConnector
+from app.models.analytics import AnalyticsPoint
+from app.models.crm import CRMCustomer
+from app.models.support import SupportTicket
+from app.services.ingest import write_json_records
+
+CUSTOMERS = [
+    CRMCustomer(
+        customer_id=i,
+        name=f"Customer “{i}”",
+        email=f"c{i}@example.com",
+        created_at=datetime(2025, 1, i, 9, 30, 15, 123456, tzinfo=timezone(timedelta(hours=-5))),
+        status="active" if i % 2 else "inactive",
+    )
+    for i in range(1, 11)
+]
+
+
+def roundtrip(tmp_path, records):
+    model = type(records[0])
+    writer = SnapshotWriter.for_model(model)
+    for record in records:
+        writer.add(record)
+    path = tmp_path / "snap"
+    assert writer.write(path, (1, 2, 3))
+    return read_snapshot_file(path, model, (1, 2, 3), typed_constructor(model)).records
+
+
+class TestSnapshotFile:
+    def test_roundtrip_every_column_kind(self, tmp_path):
+        """Test aware and naive datetimes, dates, ints and strings come back identical."""
+        naive = [c.model_copy(update={"created_at": c.created_at.replace(tzinfo=None)}) for c in CUSTOMERS]
+        points = [AnalyticsPoint(metric="m", date=date(2024, 2, 29) + timedelta(days=i), value=-i) for i in range(5)]
+        for records in (CUSTOMERS, naive, points):
+            loaded = roundtrip(tmp_path, records)
+            assert loaded == records
+            assert [r.model_dump_json() for r in loaded] == [r.model_dump_json() for r in records]
+
+    def test_stale_or_foreign_snapshot_ignored(self, tmp_path):
+        """Test a snapshot is only used for its own model and JSON file version."""
+        assert roundtrip(tmp_path, CUSTOMERS) is not None
+        path = tmp_path / "snap"
+        assert read_snapshot_file(path, CRMCustomer, (1, 2, 4), typed_constructor(CRMCustomer)) is None
+        assert read_snapshot_file(path, SupportTicket, (1, 2, 3), typed_constructor(SupportTicket)) is None
+
+        retyped = create_model("CRMCustomer", __base__=CRMCustomer, customer_id=(str, ...))  # same names
+        assert read_snapshot_file(path, retyped, (1, 2, 3), typed_constructor(retyped)) is None
+        path.write_bytes(path.read_bytes()[:-3])
+        assert read_snapshot_file(path, CRMCustomer, (1, 2, 3), typed_constructor(CRMCustomer)) is None
+
+    def test_mixed_offsets_not_written(self, tmp_path):
+        """Test a datetime column with several UTC offsets leaves only the JSON file."""
+        mixed = CUSTOMERS[:2] + [CUSTOMERS[2].model_copy(update={"created_at": datetime(2025, 1, 1)})]
+        path = tmp_path / "customers.json"
+        write_json_records(path, mixed)
+        assert not snapshot_file_path(path).exists()
+
+
+    def test_int_beyond_64_bits_not_written(self, tmp_path, monkeypatch):
+        """Test an int column overflowing 64 bits leaves only the JSON file, which still loads."""
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / "data" / "customers.json"
+        huge = CUSTOMERS[0].model_copy(update={"customer_id": 2**70})
+        write_json_records(path, [CUSTOMERS[1], huge])
+        assert not snapshot_file_path(path).exists()
+        base.invalidate_snapshot()
+        assert [c.customer_id for c in CRMConnector().fetch()] == [2, 2**70]
+
+
+class TestSnapshotLoad:
+    def test_load_prefers_snapshot_file(self, tmp_path, monkeypatch):
+        """Test ingested files cold-load from the snapshot file without opening the JSON."""
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / "data" / "analytics.json"
+        points = [AnalyticsPoint(metric="revenue", date=date(2025, 1, d), value=d * 10) for d in range(1, 29)]
+        write_json_records(path, points)
+        base.invalidate_snapshot()
+
+        def fail_open(*args, **kwargs):
+            raise AssertionError("JSON file should not be parsed")
+
+        with monkeypatch.context() as m:
+            m.setattr(base, "open", fail_open, raising=False)
+            snapshot = AnalyticsConnector().load_snapshot(path)
+        assert snapshot.records == points
+        assert snapshot.key == file_key(path)
+
+    def test_hand_edited_json_wins(self, tmp_path, monkeypatch):
+        """Test a snapshot file left behind by an older JSON version is not used."""
+        monkeypatch.chdir(tmp_path)
+        connector = SupportConnector()
+        path = tmp_path / "data" / "support_tickets.json"
+        ticket = SupportTicket(
+            ticket_id=1, customer_id=1, subject="s", priority="low", created_at=datetime(2025, 1, 1), status="open"
+        )
+        write_json_records(path, [ticket])
+        path.write_text(json.dumps([{**ticket.model_dump(mode="json"), "ticket_id": 2, "subject": "edited"}]))
+        base.invalidate_snapshot()
+        assert [t.subject for t in connector.fetch()] == ["edited"]
@@ -0,0 +1,150 @@
+"""Tests for the SQLite-backed connector."""
+
+import json
+
+import pytest
+
+from app.connectors.base import QuerySpec
+from app.connectors.sqlite_connector import _ORDER_RECENT, SQLiteConnector
+from app.models.support import SupportTicket
+from app.services.business_rules import apply_filters, decode_cursor, prioritize_recent
+
+
+@pytest.fixture
+def support_json(tmp_path):
+    """JSON data directory with tickets sharing some timestamps."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    tickets = [
+        {
+            "ticket_id": i,
+            "customer_id": i % 4,
+            "subject": f"Issue {i}",
+            "priority": ["low", "medium", "high"][i % 3],
+            "created_at": f"2025-01-{(i % 7) + 1:02d}T00:00:00",
+            "status": "open" if i % 2 == 0 else "closed",
+        }
+        for i in range(1, 31)
+    ]
+    (data_dir / "support_tickets.json").write_text(json.dumps(tickets))
+    return data_dir
+
+
+@pytest.fixture
+def connector(support_json, tmp_path):
+    return SQLiteConnector("support", db_path=tmp_path / "udc.sqlite3", data_dir=support_json)
+
+
+class TestSQLiteConnector:
+    def test_imports_existing_json(self, connector):
+        """Test the table is seeded from the JSON file on first use."""
+        records = connector.fetch()
+        assert len(records) == 30
+        assert isinstance(records[0], SupportTicket)
+
+    def test_concurrent_first_use_waits_for_seed(self, connector, monkeypatch):
+        """Test a reader arriving while the table is being seeded sees the seeded rows, not an empty table."""
+        import threading
+        import time
+
+        from app.connectors import sqlite_connector
+
+        real_read_json = sqlite_connector._read_json
+
+        def slow_read_json(path):
+            time.sleep(0.2)
+            return real_read_json(path)
+
+        monkeypatch.setattr(sqlite_connector, "_read_json", slow_read_json)
+        totals = []
+        seeding = threading.Thread(target=lambda: totals.append(connector.query(QuerySpec.build()).total))
+        seeding.start()
+        time.sleep(0.05)
+        totals.append(connector.query(QuerySpec.build()).total)
+        seeding.join()
+        assert totals == [30, 30]
+
+    def test_query_matches_python_fallback(self, connector):
+        """Test filters, recency order and tie-breaking match business rules."""
+        spec = QuerySpec.build(status="open", priority="high", offset=1, limit=3)
+        result = connector.query(spec)
+
+        expected = prioritize_recent(apply_filters(connector.fetch(), status="open", priority="high"))
+        assert result.total == len(expected)
+        assert result.records == expected[1:4]
+        assert result.data_type == "tabular_support"
+
+    def test_cursor_pages_match_fallback(self, connector):
+        """Test keyset pages, including across timestamp ties."""
+        from app.connectors.base import BaseConnector
+
+        spec = QuerySpec.build(status="open", limit=4)
+        sqlite_page = connector.query(spec)
+        fallback_page = BaseConnector.query(connector, spec)
+        assert sqlite_page.next_cursor == fallback_page.next_cursor
+
+        after = decode_cursor(sqlite_page.next_cursor)
+        next_spec = QuerySpec.build(status="open", limit=4, after=after)
+        assert connector.query(next_spec).records == BaseConnector.query(connector, next_spec).records
+
+    def test_cursor_page_seeks_index(self, connector):
+        """Test the keyset condition bounds the index search rather than scanning from the newest row."""
+        connector.fetch()
+        after = decode_cursor(connector.query(QuerySpec.build(status="open", limit=4)).next_cursor)
+        where, params, seek, seek_params = connector._where(QuerySpec.build(status="open", limit=4, after=after))
+        plan = connector._connect().execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM {connector.spec.table}{where}{seek}{_ORDER_RECENT}",
+            [*params, *seek_params],
+        ).fetchall()
+        assert any("sort_key<?" in row[-1] for row in plan)
+
+    def test_stream_matches_query(self, connector):
+        """Test streaming yields the same rows as an unpaginated query."""
+        spec = QuerySpec.build(status="open", offset=2)
+        assert list(connector.stream(spec)) == connector.query(spec).records
+
+        after = decode_cursor(connector.query(QuerySpec.build(limit=5)).next_cursor)
+        spec = QuerySpec.build(after=after)
+        assert list(connector.stream(spec)) == connector.query(spec).records
+
+    def test_merge_counts(self, connector):
+        """Test upsert and append report inserted, updated and unchanged rows."""
+        existing = connector.query(QuerySpec.build(order_by=None, limit=2)).records
+        changed = existing[1].model_copy(update={"subject": "Edited"})
+        new = existing[0].model_copy(update={"ticket_id": 500})
+
+        assert connector.merge([existing[0], changed, new]) == (1, 1, 1)
+        assert connector.query(QuerySpec.build()).total == 31
+        assert connector.merge([changed.model_copy(update={"subject": "Ignored"})], update=False) == (0, 0, 1)
+        subjects = {t.ticket_id: t.subject for t in connector.fetch()}
+        assert subjects[changed.ticket_id] == "Edited"
+
+    def test_snapshot_version_tracks_writes(self, connector):
+        """Test every committed write bumps the version reported by queries."""
+        first = connector.query(QuerySpec.build(limit=1)).snapshot_version
+        connector.merge(connector.fetch()[:1])  # no change, no new version
+        assert connector.query(QuerySpec.build(limit=1)).snapshot_version == first
+        connector.bulk_load(connector.fetch())
+        assert connector.query(QuerySpec.build(limit=1)).snapshot_version == first + 1
+
+    def test_ignores_filters_source_lacks(self, connector):
+        """Test that a metric filter does not restrict support tickets."""
+        result = connector.query(QuerySpec.build(metric="revenue", limit=5))
+        assert result.total == 30
+
+    def test_bulk_load_replaces_rows(self, connector):
+        """Test bulk loading replaces the table contents."""
+        written = connector.bulk_load(
+            [
+                {
+                    "ticket_id": 99,
+                    "customer_id": 1,
+                    "subject": "Only",
+                    "priority": "low",
+                    "created_at": "2025-02-01T00:00:00",
+                    "status": "open",
+                }
+            ]
+        )
+        assert written == 1
+        assert [t.ticket_id for t in connector.fetch()] == [99]